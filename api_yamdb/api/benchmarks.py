@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from statistics import mean
+from time import perf_counter
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rollback():
+    """Выполняет замеры в транзакции, которая затем откатывается."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def measure(func, repeat):
+    """
+    Вызывает func(i) repeat раз и возвращает среднее и 95-й перцентиль
+    времени выполнения в миллисекундах и среднее число SQL-запросов.
+    """
+    timings = []
+    queries = 0
+    for i in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = perf_counter()
+            func(i)
+            timings.append((perf_counter() - start) * 1000)
+        queries += len(context)
+    timings.sort()
+    return {
+        'avg_ms': mean(timings),
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'queries': queries / repeat,
+    }
+
+
+def format_result(name, result):
+    return (
+        f'{name}: {result["avg_ms"]:.3f} мс (p95 {result["p95_ms"]:.3f} мс), '
+        f'{result["queries"]:.1f} запросов'
+    )
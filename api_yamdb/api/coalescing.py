@@ -0,0 +1,108 @@
+import threading
+from collections import Counter
+from hashlib import md5
+from time import monotonic, sleep
+
+from django.conf import settings
+from django.core.cache import cache
+
+MISSING = object()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = MISSING
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вычислений (single-flight).
+    Первый вызов с ключом выполняет функцию, одновременные вызовы с тем
+    же ключом в других потоках процесса ждут его и получают тот же
+    результат. Если первый вызов завершился ошибкой или не уложился в
+    WAIT_TIMEOUT, ожидающие выполняют функцию сами. С CROSS_WORKER
+    вычисление объединяется и между процессами: ведущий вызов берёт
+    блокировку в кэше Django и сохраняет в нём результат, вызовы других
+    процессов ждут его, опрашивая кэш (settings.CACHES, общий для
+    процессов). Результат не кэшируется: следующий вызов после
+    завершения ведущего вычисляет его заново.
+    Объединение внутри процесса возможно, только если процесс обслуживает
+    запросы параллельно: gunicorn запускается с потоковыми воркерами
+    (--worker-class gthread --threads N, см. Dockerfile), с синхронными
+    однопоточными воркерами объединяет только CROSS_WORKER.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = Counter()
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'leaders': self.stats['leaders'],
+                'coalesced': self.stats['coalesced'],
+                'cross_worker': self.stats['cross_worker'],
+                'fallbacks': self.stats['fallbacks'],
+                'in_flight': len(self._calls),
+            }
+
+    def do(self, key, func):
+        options = settings.COALESCING
+        if not options['ENABLED']:
+            return func()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait(options['WAIT_TIMEOUT'])
+            if call.result is not MISSING:
+                self.count('coalesced')
+                return call.result
+            self.count('fallbacks')
+            return func()
+        try:
+            call.result = self.compute(key, func)
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def compute(self, key, func):
+        options = settings.COALESCING
+        if not options['CROSS_WORKER']:
+            self.count('leaders')
+            return func()
+        result_key = f'single-flight:{md5(key.encode()).hexdigest()}'
+        lock_key = f'{result_key}:lock'
+        if cache.add(lock_key, 1, options['WAIT_TIMEOUT']):
+            self.count('leaders')
+            cache.delete(result_key)
+            try:
+                result = func()
+                cache.set(result_key, result, options['RESULT_TTL'])
+            finally:
+                cache.delete(lock_key)
+            return result
+        deadline = monotonic() + options['WAIT_TIMEOUT']
+        while monotonic() < deadline:
+            result = cache.get(result_key, MISSING)
+            if result is not MISSING:
+                self.count('cross_worker')
+                return result
+            if cache.get(lock_key) is None:
+                break
+            sleep(options['POLL_INTERVAL'])
+        self.count('fallbacks')
+        return func()
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,78 @@
+from django.db import IntegrityError, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from reviews.documents import titles_changed_signal
+from reviews.models import Title, TitleDocument
+
+from .v1.serializers import TitleDocumentSerializer
+
+
+def render_title(title):
+    """
+    JSON-документ произведения. Произведение загружается через
+    document_titles: категория и жанры читаются из базы.
+    """
+    return JSONRenderer().render(TitleDocumentSerializer(title).data)
+
+
+def document_titles(queryset):
+    return queryset.select_related('category').prefetch_related(
+        'genretitle_set__genre'
+    )
+
+
+def live_titles(title_ids):
+    return document_titles(
+        Title.objects.filter(pk__in=title_ids, is_deleted=False)
+    )
+
+
+def store_document(title, body):
+    """Сохраняет документ запросом UPDATE, а если его нет — INSERT."""
+    values = {'body': body, 'updated_at': timezone.now()}
+    documents = TitleDocument.objects.filter(title_id=title.pk)
+    if documents.update(**values):
+        return values
+    try:
+        with transaction.atomic():
+            TitleDocument.objects.create(title_id=title.pk, **values)
+    except IntegrityError:
+        documents.update(**values)
+    return values
+
+
+def refresh_title_documents(title_ids):
+    """
+    Строит и сохраняет документы произведений, документы удалённых
+    произведений удаляет. Возвращает словарь id -> (документ, дата).
+    """
+    documents = {}
+    for title in live_titles(title_ids):
+        values = store_document(title, render_title(title))
+        documents[title.pk] = (values['body'], values['updated_at'])
+    TitleDocument.objects.filter(title_id__in=title_ids).exclude(
+        title_id__in=documents
+    ).delete()
+    return documents
+
+
+@receiver(titles_changed_signal)
+def titles_changed(sender, title_ids, **kwargs):
+    refresh_title_documents(title_ids)
+
+
+def title_document(title_id):
+    """
+    Документ произведения и дата его обновления: один запрос по
+    первичному ключу, отсутствующий документ строится. None, если
+    произведения нет.
+    """
+    document = (
+        TitleDocument.objects.filter(title_id=title_id)
+        .values_list('body', 'updated_at')
+        .first()
+    )
+    if document is None:
+        document = refresh_title_documents([title_id]).get(title_id)
+    return document
@@ -0,0 +1,166 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else part.encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _error(detail, status, **headers):
+    response = JsonResponse(
+        {'detail': detail},
+        status=status,
+        json_dumps_params={'ensure_ascii': False},
+    )
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def client_scope(request):
+    """
+    Пространство ключей клиента: хэш заголовка Authorization, а для
+    анонимных запросов — хэш адреса клиента. Адрес берётся из заголовка
+    X-Real-IP, который выставляет nginx, или из REMOTE_ADDR.
+    """
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if authorization:
+        return _sha256('authorization', authorization)
+    address = request.META.get('HTTP_X_REAL_IP') or request.META.get(
+        'REMOTE_ADDR', ''
+    )
+    return _sha256('address', address)
+
+
+def claim_key(key, fingerprint):
+    """
+    Занимает ключ вставкой записи без ответа. Возвращает False, если
+    ключ уже занят. Просроченные записи и записи брошенных запросов
+    предварительно удаляются.
+    """
+    options = settings.IDEMPOTENCY
+    now = timezone.now()
+    IdempotencyKey.objects.filter(key=key).filter(
+        Q(created__lt=now - timedelta(seconds=options['TTL']))
+        | Q(
+            status_code__isnull=True,
+            created__lt=now - timedelta(seconds=options['LOCK_TIMEOUT']),
+        )
+    ).delete()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(key=key, fingerprint=fingerprint)
+    except IntegrityError:
+        return False
+    return True
+
+
+def replay(record, fingerprint):
+    """
+    Ответ на повтор запроса с уже занятым ключом. record равен None, если
+    запись удалена после неудачной попытки её занять.
+    """
+    if record and record.fingerprint != fingerprint:
+        return _error(
+            'Ключ идемпотентности уже использован для другого запроса.',
+            422,
+        )
+    if not record or record.status_code is None:
+        return _error(
+            'Запрос с этим ключом идемпотентности ещё выполняется.',
+            409,
+            **{'Retry-After': '1'},
+        )
+    response = HttpResponse(
+        bytes(record.body),
+        status=record.status_code,
+        content_type=record.content_type,
+    )
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def store_response(key, response):
+    """
+    Сохраняет ответ для повторов. Ошибки сервера и потоковые ответы не
+    сохраняются: ключ освобождается, и повтор выполнит запрос заново.
+    """
+    keys = IdempotencyKey.objects.filter(key=key)
+    if response.streaming or response.status_code >= 500:
+        keys.delete()
+        return
+    keys.update(
+        status_code=response.status_code,
+        content_type=response.get('Content-Type', ''),
+        body=response.content,
+    )
+
+
+def purge_idempotency_keys():
+    """Удаляет записи старше срока хранения. Возвращает их количество."""
+    expiry = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY['TTL'])
+    return IdempotencyKey.objects.filter(created__lt=expiry).delete()[0]
+
+
+class IdempotencyMiddleware:
+    """
+    Поддержка заголовка Idempotency-Key для изменяющих запросов к API.
+    Первый запрос с ключом занимает его и выполняется, его ответ
+    сохраняется в таблице на срок TTL и возвращается на повторы того же
+    запроса без вызова view (с заголовком Idempotent-Replayed). Повтор,
+    пришедший до окончания первого запроса, получает 409, тот же ключ с
+    другим запросом — 422. Эндпоинты из EXCLUDED_PATHS, отвечающие
+    учётными данными, заголовок не учитывают.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def applies_to(request):
+        options = settings.IDEMPOTENCY
+        return (
+            options['HEADER'] in request.META
+            and request.method in options['METHODS']
+            and request.path_info.startswith(
+                settings.STATELESS_PATH_PREFIXES
+            )
+            and request.path_info not in options['EXCLUDED_PATHS']
+        )
+
+    def __call__(self, request):
+        if not self.applies_to(request):
+            return self.get_response(request)
+        header = request.META[settings.IDEMPOTENCY['HEADER']]
+        if not header or len(header) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return _error(
+                f'Ключ идемпотентности должен содержать от 1 до '
+                f'{IDEMPOTENCY_KEY_MAX_LENGTH} символов.',
+                400,
+            )
+        key = f'{client_scope(request)}:{header}'
+        fingerprint = _sha256(
+            request.method, request.get_full_path(), request.body
+        )
+        if not claim_key(key, fingerprint):
+            return replay(
+                IdempotencyKey.objects.filter(key=key).first(), fingerprint
+            )
+        response = self.get_response(request)
+        store_response(key, response)
+        return response
@@ -0,0 +1,67 @@
+from api.benchmarks import format_result, measure
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.test import Client, override_settings
+
+# Прежний набор: все middleware выполнялись для каждого запроса.
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.profiling.ProfilingMiddleware',
+    'api.nplusone.NPlusOneMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+URLS = (
+    ('корень API', '/api/v1/'),
+    ('категории', '/api/v1/categories/'),
+    ('админка', '/admin/login/'),
+)
+
+
+class Command(BaseCommand):
+    """
+    Замер времени ответа с прежним набором middleware, который
+    выполнялся для каждого запроса, и с текущими настройками. Разница
+    для запроса к API — сэкономленные накладные расходы на запрос,
+    запросы к админке проходят через те же middleware, что и раньше.
+    Наборы замеряются поочерёдно в нескольких раундах, для каждого
+    берётся лучший раунд.
+    """
+
+    help = 'Замер накладных расходов middleware на запрос.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=1000)
+        parser.add_argument('--rounds', type=int, default=3)
+
+    def measure_url(self, middleware, url, repeat):
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client()
+            client.get(url)
+            return measure(lambda i: client.get(url), repeat)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        for label, url in URLS:
+            before, after = (
+                min(results, key=lambda result: result['avg_ms'])
+                for results in zip(
+                    *(
+                        (
+                            self.measure_url(FULL_MIDDLEWARE, url, repeat),
+                            self.measure_url(settings.MIDDLEWARE, url, repeat),
+                        )
+                        for _ in range(options['rounds'])
+                    )
+                )
+            )
+            self.stdout.write(format_result(f'{label}, прежние', before))
+            self.stdout.write(format_result(f'{label}, текущие', after))
+            self.stdout.write(
+                f'{label}, разница: '
+                f'{before["avg_ms"] - after["avg_ms"]:.3f} мс на запрос'
+            )
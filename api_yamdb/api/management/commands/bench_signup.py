@@ -0,0 +1,46 @@
+from api.benchmarks import format_result, measure, rollback
+from django.core.management import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+class Command(BaseCommand):
+    """
+    Замер числа запросов и времени регистрации пользователя.
+    Все созданные пользователи удаляются по окончании замера.
+    """
+
+    help = 'Замер запросов и времени на одну регистрацию.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+    )
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        client = APIClient()
+
+        def signup(i, email_prefix='bench'):
+            client.post(
+                SIGNUP_URL,
+                {
+                    'username': f'bench_signup_{i}',
+                    'email': f'{email_prefix}_{i}@example.com',
+                },
+            )
+
+        with rollback():
+            cases = (
+                ('Новый пользователь', signup),
+                ('Повторная регистрация', signup),
+                (
+                    'Занятые имя и почта',
+                    lambda i: signup(i, email_prefix='other'),
+                ),
+            )
+            for name, func in cases:
+                self.stdout.write(format_result(name, measure(func, repeat)))
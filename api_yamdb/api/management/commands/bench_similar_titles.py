@@ -0,0 +1,56 @@
+import resource
+from time import perf_counter
+
+import numpy as np
+from django.core.management import BaseCommand
+from reviews.similarity import (
+    SIMILAR_MAX_CELLS,
+    SIMILAR_TOP_K,
+    similar_titles,
+)
+
+
+class Command(BaseCommand):
+    """
+    Замер времени и памяти расчёта похожих произведений на синтетическом
+    каталоге без обращения к базе данных.
+    """
+
+    help = 'Замер расчёта похожих произведений на синтетических данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=50000)
+        parser.add_argument('--users', type=int, default=500000)
+        parser.add_argument('--reviews', type=int, default=2000000)
+        parser.add_argument('--top-k', type=int, default=SIMILAR_TOP_K)
+        parser.add_argument(
+            '--max-cells', type=int, default=SIMILAR_MAX_CELLS
+        )
+
+    def handle(self, *args, **options):
+        generator = np.random.default_rng(0)
+        count = options['reviews']
+        # Популярность произведений распределена неравномерно.
+        titles = (
+            generator.zipf(1.3, count) % options['titles']
+        ).astype(np.int64)
+        reviews = np.column_stack(
+            (
+                titles,
+                generator.integers(0, options['users'], count),
+                generator.integers(1, 11, count),
+            )
+        )
+        start = perf_counter()
+        pairs = sum(
+            1
+            for _ in similar_titles(
+                reviews, options['top_k'], options['max_cells']
+            )
+        )
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(
+            f'Отзывов: {count}, пар: {pairs}, '
+            f'время: {perf_counter() - start:.1f} с, '
+            f'пик памяти процесса: {peak:.0f} МБ.'
+        )
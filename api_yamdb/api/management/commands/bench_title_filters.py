@@ -0,0 +1,101 @@
+import random
+
+from api.benchmarks import format_result, measure, rollback
+from api.v1.filters import TitleFilter
+from django.core.management import BaseCommand
+from django.db import connection
+from reviews.models import Category, Genre, GenreTitle, Title
+
+BATCH_SIZE = 5000
+GENRES = 20
+CASES = (
+    ('один жанр', {'genre': 'bench-genre-0'}),
+    ('два жанра, any', {'genre': 'bench-genre-0,bench-genre-1'}),
+    (
+        'два жанра, all',
+        {'genre': 'bench-genre-0,bench-genre-1', 'genre_match': 'all'},
+    ),
+    ('годы и рейтинг', {'year_min': 1990, 'year_max': 2000, 'rating_min': 7}),
+)
+
+
+class Command(BaseCommand):
+    """
+    Замер фильтрации списка произведений: прежний фильтр по вхождению
+    подстроки в slug жанра через JOIN со связями (дублирует произведения
+    с несколькими подходящими жанрами) и фильтры TitleFilter с
+    подзапросами EXISTS. Для каждого варианта замеряются первая страница
+    и COUNT(*) для пагинации.
+    Созданные произведения удаляются по окончании замера.
+    """
+
+    help = 'Замер фильтров списка произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def fill_catalog(self, size):
+        generator = random.Random(size)
+        category = Category.objects.create(
+            name='bench_title_filters', slug='bench-title-filters'
+        )
+        Genre.objects.bulk_create(
+            Genre(name=f'bench_genre_{i}', slug=f'bench-genre-{i}')
+            for i in range(GENRES)
+        )
+        genres = list(Genre.objects.filter(slug__startswith='bench-genre-'))
+        for start in range(0, size, BATCH_SIZE):
+            titles = Title.objects.bulk_create(
+                Title(
+                    name=f'Произведение {generator.random():.8f}',
+                    year=generator.randint(1900, 2023),
+                    category=category,
+                    rating=generator.uniform(1, 10),
+                )
+                for _ in range(min(BATCH_SIZE, size - start))
+            )
+            if not titles[0].pk:
+                titles = Title.objects.filter(category=category).order_by(
+                    '-id'
+                )[: len(titles)]
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title=title, genre=genre)
+                for title in titles
+                for genre in generator.sample(genres, 3)
+            )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE reviews_title')
+                cursor.execute('ANALYZE reviews_genretitle')
+
+    def write_case(self, name, queryset, repeat):
+        queryset = queryset.order_by('-id')
+        self.stdout.write(
+            format_result(
+                f'{name}, страница',
+                measure(lambda i: list(queryset.all()[:10]), repeat),
+            )
+        )
+        self.stdout.write(
+            format_result(
+                f'{name}, COUNT(*)',
+                measure(lambda i: queryset.count(), repeat),
+            )
+        )
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with rollback():
+            self.fill_catalog(options['size'])
+            titles = Title.objects.filter(is_deleted=False)
+            old = titles.filter(genre__slug__icontains='bench-genre-1')
+            self.stdout.write(
+                f'Прежний фильтр по подстроке bench-genre-1: '
+                f'{old.count()} строк, {old.distinct().count()} '
+                f'произведений.'
+            )
+            self.write_case('прежний фильтр, подстрока', old, repeat)
+            for name, data in CASES:
+                queryset = TitleFilter(data, queryset=titles).qs
+                self.write_case(name, queryset, repeat)
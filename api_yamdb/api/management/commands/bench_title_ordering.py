@@ -0,0 +1,95 @@
+import random
+
+from api.benchmarks import format_result, measure, rollback
+from api.v1.views import TitleViewSet
+from django.core.management import BaseCommand
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from reviews.models import Category, Title
+
+ORDERINGS = ('-id', 'name', '-year', 'rating', '-rating', '-review_count')
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    """
+    Замер времени получения первой страницы списка произведений при
+    разных вариантах сортировки на каталогах возрастающего размера.
+    Запрос страницы обслуживается индексом и не должен зависеть от
+    размера каталога; полный ответ API дополнительно считает COUNT(*)
+    для пагинации и валидаторов условного запроса.
+    Созданные произведения удаляются по окончании замера.
+    """
+
+    help = 'Замер страницы списка произведений с сортировкой.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,100000',
+            help='Размеры каталога через запятую.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def page_query(self, ordering):
+        view = TitleViewSet(action='list', format_kwarg=None, kwargs={})
+        view.request = Request(
+            APIRequestFactory().get('/', {'ordering': ordering})
+        )
+        queryset = view.filter_queryset(view.get_queryset())
+        return lambda i: list(queryset.all()[:10])
+
+    def fill_catalog(self, category, size):
+        generator = random.Random(size)
+        created = Title.objects.count()
+        while created < size:
+            batch = min(BATCH_SIZE, size - created)
+            Title.objects.bulk_create(
+                Title(
+                    name=f'Произведение {generator.random():.8f}',
+                    year=generator.randint(1900, 2023),
+                    category=category,
+                    review_count=generator.randint(0, 500),
+                    rating=(
+                        generator.uniform(1, 10)
+                        if generator.random() < 0.8
+                        else None
+                    ),
+                )
+                for _ in range(batch)
+            )
+            created += batch
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE reviews_title')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        client = APIClient()
+        with rollback():
+            category = Category.objects.create(
+                name='bench_title_ordering', slug='bench-title-ordering'
+            )
+            for size in map(int, options['sizes'].split(',')):
+                self.fill_catalog(category, size)
+                self.stdout.write(f'Произведений: {Title.objects.count()}')
+                for ordering in ORDERINGS:
+                    self.stdout.write(
+                        format_result(
+                            f'  страница, ordering={ordering}',
+                            measure(self.page_query(ordering), repeat),
+                        )
+                    )
+                    self.stdout.write(
+                        format_result(
+                            f'  ответ API, ordering={ordering}',
+                            measure(
+                                lambda i: client.get(
+                                    '/api/v1/titles/',
+                                    {'ordering': ordering},
+                                ),
+                                repeat,
+                            ),
+                        )
+                    )
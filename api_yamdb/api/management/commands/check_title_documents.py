@@ -0,0 +1,64 @@
+from api.documents import document_titles, render_title, store_document
+from django.core.management import BaseCommand
+from reviews.models import Title, TitleDocument
+
+
+class Command(BaseCommand):
+    """
+    Проверка согласованности документов произведений: каждый документ
+    сравнивается с заново построенным. Отсутствующие и устаревшие
+    документы, а также документы удалённых произведений выводятся, а с
+    --fix исправляются.
+    """
+
+    help = 'Проверяет и исправляет документы произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def check_batch(self, titles, fix):
+        stored = dict(
+            TitleDocument.objects.filter(title__in=titles).values_list(
+                'title_id', 'body'
+            )
+        )
+        missing = stale = 0
+        for title in titles:
+            body = render_title(title)
+            if title.pk not in stored:
+                missing += 1
+            elif bytes(stored[title.pk]) != body:
+                stale += 1
+            else:
+                continue
+            if fix:
+                store_document(title, body)
+        return missing, stale
+
+    def handle(self, *args, **options):
+        missing = stale = 0
+        last_pk = 0
+        while True:
+            titles = list(
+                document_titles(
+                    Title.objects.filter(is_deleted=False, pk__gt=last_pk)
+                ).order_by('pk')[: options['batch_size']]
+            )
+            if not titles:
+                break
+            batch_missing, batch_stale = self.check_batch(
+                titles, options['fix']
+            )
+            missing += batch_missing
+            stale += batch_stale
+            last_pk = titles[-1].pk
+        orphaned = TitleDocument.objects.filter(title__is_deleted=True)
+        orphaned_count = orphaned.count()
+        if options['fix']:
+            orphaned.delete()
+        self.stdout.write(
+            f'Отсутствует документов: {missing}, устарело: {stale}, '
+            f'документов удалённых произведений: {orphaned_count}.'
+            + (' Исправлено.' if options['fix'] else '')
+        )
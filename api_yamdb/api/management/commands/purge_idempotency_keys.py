@@ -0,0 +1,15 @@
+from api.idempotency import purge_idempotency_keys
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Команда для удаления ключей идемпотентности старше срока хранения.
+    Запускается периодически (например, из cron).
+    """
+
+    help = 'Удаляет просроченные ключи идемпотентности.'
+
+    def handle(self, *args, **options):
+        deleted = purge_idempotency_keys()
+        self.stdout.write(f'Удалено ключей идемпотентности: {deleted}.')
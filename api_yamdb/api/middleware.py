@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+class BrowserOnlyMiddleware:
+    """
+    Middleware сессий, CSRF, аутентификации по сессии, сообщений и
+    X-Frame-Options нужны только страницам для браузера (админке). Они
+    перечислены в BROWSER_MIDDLEWARE и выполняются внутри этого
+    middleware, а запросы к путям STATELESS_PATH_PREFIXES (API с
+    аутентификацией по JWT) передаются дальше без них. Из хуков
+    поддерживается только process_view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.browser_handler = get_response
+        self.view_hooks = []
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            middleware = import_string(path)(self.browser_handler)
+            if hasattr(middleware, 'process_view'):
+                self.view_hooks.insert(0, middleware.process_view)
+            self.browser_handler = convert_exception_to_response(middleware)
+
+    @staticmethod
+    def is_stateless(request):
+        return request.path_info.startswith(
+            settings.STATELESS_PATH_PREFIXES
+        )
+
+    def __call__(self, request):
+        if self.is_stateless(request):
+            return self.get_response(request)
+        return self.browser_handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_stateless(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    Ключ идемпотентности запроса к API (заголовок Idempotency-Key) и
+    сохранённый первый ответ на него. Пока запрос выполняется, код ответа
+    пуст. Ключ включает хэш заголовка Authorization, а для анонимных
+    запросов — хэш адреса клиента, так что ключи разных клиентов не
+    пересекаются. Записи старше срока хранения удаляются.
+    """
+
+    key = models.CharField(
+        verbose_name='Ключ',
+        max_length=320,
+        unique=True,
+    )
+    fingerprint = models.CharField(
+        verbose_name='Хэш запроса',
+        max_length=64,
+    )
+    status_code = models.PositiveSmallIntegerField(
+        verbose_name='Код ответа',
+        null=True,
+        blank=True,
+    )
+    content_type = models.CharField(
+        verbose_name='Тип ответа',
+        max_length=100,
+        blank=True,
+    )
+    body = models.BinaryField(
+        verbose_name='Тело ответа',
+        null=True,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания', auto_now_add=True, db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Ключ идемпотентности'
+        verbose_name_plural = 'Ключи идемпотентности'
+        ordering = ['created']
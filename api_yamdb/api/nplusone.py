@@ -0,0 +1,113 @@
+import logging
+import re
+import traceback
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+LITERALS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+class NPlusOneError(AssertionError):
+    """Повторяющийся SQL-запрос одной формы в рамках одного запроса."""
+
+
+def fingerprint(sql):
+    """
+    Форма SQL-запроса: строки и числа заменяются на ?, списки значений
+    IN (...) сворачиваются, пробелы нормализуются.
+    """
+    for pattern, replacement in LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def call_site():
+    """
+    Место вызова запроса: ближайший кадр стека из кода проекта, а если
+    такого нет — ближайший кадр вне ORM Django. Стек обходится от места
+    вызова без чтения исходников и только до NPlusOneMiddleware: внешние
+    middleware не рассматриваются.
+    """
+    base_dir = str(settings.BASE_DIR)
+    fallback = None
+    for frame, lineno in traceback.walk_stack(None):
+        code = frame.f_code
+        if code is NPlusOneMiddleware.__call__.__code__:
+            break
+        path = code.co_filename
+        if path.endswith('/api/nplusone.py') or '/django/db/' in path:
+            continue
+        if path.startswith(base_dir) and 'site-packages' not in path:
+            return f'{path}:{lineno} in {code.co_name}'
+        if fallback is None:
+            fallback = f'{path}:{lineno} in {code.co_name}'
+    return fallback or 'неизвестно'
+
+
+class QueryShapeCounter:
+    """
+    Обёртка execute_wrapper, считающая запросы одной формы. Когда форма
+    встречается больше THRESHOLD раз, запоминается место вызова (в
+    строгом режиме сразу выбрасывается NPlusOneError). Стек читается
+    только в этот момент, остальные запросы обходятся без него.
+    """
+
+    def __init__(self, threshold, strict):
+        self.threshold = threshold
+        self.strict = strict
+        self.counts = Counter()
+        self.detected = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many:
+            shape = fingerprint(sql)
+            self.counts[shape] += 1
+            if self.counts[shape] == self.threshold + 1:
+                site = call_site()
+                if self.strict:
+                    raise NPlusOneError(
+                        f'N+1: запрос выполнен больше {self.threshold} раз '
+                        f'({site}): {shape}'
+                    )
+                self.detected[shape] = site
+        return execute(sql, params, many, context)
+
+
+class NPlusOneMiddleware:
+    """
+    Обнаружение N+1: запросы к базе в рамках одного HTTP-запроса
+    группируются по форме SQL. Повторение формы больше THRESHOLD раз
+    записывается в журнал с местом вызова, а в строгом режиме (RAISE,
+    включается в тестах) приводит к исключению.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = settings.NPLUSONE
+        if not options['ENABLED']:
+            return self.get_response(request)
+        counter = QueryShapeCounter(options['THRESHOLD'], options['RAISE'])
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        for shape, site in counter.detected.items():
+            logger.warning(
+                'N+1 в %s %s: %s запросов (%s): %s',
+                request.method,
+                request.path,
+                counter.counts[shape],
+                site,
+                shape,
+            )
+        return response
@@ -0,0 +1,235 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+REPORT_ID_PATTERN = r'\d+-\d+'
+REPORT_SUMMARY_FIELDS = (
+    'id',
+    'created',
+    'trigger',
+    'method',
+    'path',
+    'status',
+    'user',
+    'duration_ms',
+    'sql_ms',
+    'queries_count',
+    'peak_memory_kb',
+)
+# tracemalloc и профилировщик общие для всего процесса, поэтому в одном
+# процессе одновременно профилируется не больше одного запроса.
+_profile_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """Обёртка execute_wrapper, запоминающая SQL-запросы и их время."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    'sql': sql,
+                    'params': params,
+                    'many': many,
+                    'duration_ms': (time.perf_counter() - started) * 1000,
+                }
+            )
+
+
+def explain(query):
+    """План выполнения запроса SELECT или текст ошибки."""
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {query["sql"]}', query['params'])
+            return '\n'.join(
+                ' '.join(map(str, row)) for row in cursor.fetchall()
+            )
+    except DatabaseError as error:
+        return f'Не удалось получить план: {error}'
+
+
+def slowest_queries(queries, count):
+    """Самые долгие запросы с планами выполнения для SELECT."""
+    slowest = sorted(queries, key=lambda query: -query['duration_ms'])
+    result = []
+    for query in slowest[:count]:
+        statement = query['sql'].lstrip()[:6].upper()
+        is_select = not query['many'] and statement in ('SELECT', 'WITH')
+        result.append(
+            {
+                'sql': query['sql'],
+                'params': repr(query['params']),
+                'duration_ms': round(query['duration_ms'], 3),
+                'plan': explain(query) if is_select else None,
+            }
+        )
+    return result
+
+
+def _reports_dir():
+    return Path(settings.PROFILING['REPORTS_DIR'])
+
+
+def save_report(report):
+    """
+    Сохраняет отчёт в каталог отчётов. Каталог работает как кольцевой
+    буфер: после записи удаляются самые старые отчёты сверх MAX_REPORTS.
+    """
+    directory = _reports_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    report['id'] = f'{time.time_ns()}-{os.getpid()}'
+    path = directory / f'{report["id"]}.json'
+    temporary_path = path.with_suffix('.tmp')
+    temporary_path.write_text(
+        json.dumps(report, ensure_ascii=False, default=str),
+        encoding='utf-8',
+    )
+    temporary_path.replace(path)
+    reports = sorted(directory.glob('*.json'))
+    for old_path in reports[: -settings.PROFILING['MAX_REPORTS']]:
+        try:
+            old_path.unlink()
+        except FileNotFoundError:
+            pass
+    return report['id']
+
+
+def load_report(report_id):
+    if not re.fullmatch(REPORT_ID_PATTERN, report_id):
+        return None
+    try:
+        return json.loads(
+            (_reports_dir() / f'{report_id}.json').read_text(
+                encoding='utf-8'
+            )
+        )
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def list_reports():
+    """Краткие сведения о сохранённых отчётах, новые первыми."""
+    reports = []
+    for path in sorted(_reports_dir().glob('*.json'), reverse=True):
+        report = load_report(path.stem)
+        if report is not None:
+            reports.append(
+                {field: report.get(field) for field in REPORT_SUMMARY_FIELDS}
+            )
+    return reports
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование отдельных запросов. Запрос профилируется, если его
+    отправил администратор с заголовком X-Profile, или если он попал в
+    случайную выборку (доля SAMPLE_RATE). Запрос выполняется под cProfile,
+    записываются SQL-запросы с временем выполнения и планами самых долгих
+    из них, а также пик памяти по tracemalloc. Отчёт сохраняется на диск,
+    его id возвращается в заголовке X-Profile-Report.
+
+    Профилированные запросы процесса выполняются по одному: запрос с
+    заголовком ждёт окончания текущего профилирования, а запрос из
+    случайной выборки в этом случае просто выполняется без профилирования.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = self.get_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+        if not _profile_lock.acquire(blocking=trigger == 'header'):
+            return self.get_response(request)
+        try:
+            return self.profile(request, trigger)
+        finally:
+            _profile_lock.release()
+
+    def get_trigger(self, request):
+        options = settings.PROFILING
+        if options['HEADER'] in request.META and self.is_admin(request):
+            return 'header'
+        if options['SAMPLE_RATE'] and random.random() < options['SAMPLE_RATE']:
+            return 'sample'
+        return None
+
+    @staticmethod
+    def is_admin(request):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            try:
+                authenticated = JWTAuthentication().authenticate(request)
+            except APIException:
+                return False
+            user = authenticated[0] if authenticated else None
+        return user is not None and user.is_authenticated and user.is_admin
+
+    def profile(self, request, trigger):
+        options = settings.PROFILING
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(recorder):
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+            duration_ms = (time.perf_counter() - started) * 1000
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(
+            'cumulative'
+        ).print_stats(options['PROFILE_LINES'])
+        user = getattr(request, 'user', None)
+        report_id = save_report(
+            {
+                'created': timezone.now().isoformat(),
+                'trigger': trigger,
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'user': str(user) if user and user.is_authenticated else None,
+                'duration_ms': round(duration_ms, 3),
+                'sql_ms': round(
+                    sum(query['duration_ms'] for query in recorder.queries),
+                    3,
+                ),
+                'queries_count': len(recorder.queries),
+                'peak_memory_kb': round(peak_memory / 1024, 1),
+                'slowest_queries': slowest_queries(
+                    recorder.queries, options['EXPLAIN_QUERIES']
+                ),
+                'profile': stream.getvalue(),
+            }
+        )
+        response['X-Profile-Report'] = report_id
+        return response
@@ -0,0 +1,27 @@
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+
+
+class RegistrySlugRelatedField(serializers.SlugRelatedField):
+    """
+    Поле для связи по slug, которое ищет объекты в реестре справочника
+    процесса (reviews.registry): к базе обращается только реестр, если
+    объекта нет в его копии.
+    """
+
+    def __init__(self, registry, **kwargs):
+        self.registry = registry
+        kwargs.setdefault('queryset', registry.queryset)
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = self.registry.by_slug(data)
+        if obj is None:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+        return obj
@@ -1,19 +1,94 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from rest_framework.filters import OrderingFilter
+from reviews.models import GenreTitle, Title
+from reviews.registry import category_registry, genre_registry
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Список строк через запятую."""
 
 
 class TitleFilter(filters.FilterSet):
-    """Фильтр выборки произведений по определенным полям."""
+    """
+    Фильтр выборки произведений по определенным полям.
+    Slug категорий и жанров сопоставляются точно по реестрам справочников
+    процесса, поэтому таблицы категорий и жанров не присоединяются.
+    Жанры проверяются подзапросами EXISTS по связям с жанрами: строки
+    произведений не повторяются. С genre_match=all произведение должно
+    иметь все перечисленные жанры, иначе хотя бы один.
+    """
 
-    category = filters.CharFilter(
-        field_name='category__slug', lookup_expr='icontains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug', lookup_expr='icontains'
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')),
+        method='filter_genre_match',
     )
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
     year = filters.NumberFilter(field_name="year", lookup_expr='exact')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category_id__in=category_registry.ids_with_slugs(value)
+        )
+
+    @staticmethod
+    def has_genres(genre_ids):
+        return Exists(
+            GenreTitle.objects.filter(
+                title=OuterRef('pk'), genre_id__in=genre_ids
+            )
+        )
+
+    def filter_genre(self, queryset, name, value):
+        genre_ids = genre_registry.ids_with_slugs(value)
+        if self.form.cleaned_data.get('genre_match') != 'all':
+            return queryset.filter(self.has_genres(genre_ids))
+        if len(genre_ids) < len(set(value)):
+            return queryset.none()
+        for genre_id in genre_ids:
+            queryset = queryset.filter(self.has_genres([genre_id]))
+        return queryset
+
+    def filter_genre_match(self, queryset, name, value):
+        return queryset
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = (
+            'category',
+            'genre',
+            'genre_match',
+            'name',
+            'year',
+            'year_min',
+            'year_max',
+            'rating_min',
+        )
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """
+    Сортировка по одному полю, которую обслуживает индекс (поле, id):
+    к полю добавляется id в том же направлении, чтобы страницы были
+    стабильными. Вместо поля может использоваться выражение из
+    ordering_expressions представления (например, с заменой null).
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        field = ordering[0]
+        name = field.lstrip('-')
+        descending = field.startswith('-')
+        if name in ('id', 'pk'):
+            return [field]
+        expression = getattr(view, 'ordering_expressions', {}).get(name)
+        if expression is not None:
+            field = expression.desc() if descending else expression.asc()
+        return [field, '-id' if descending else 'id']
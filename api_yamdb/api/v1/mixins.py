@@ -0,0 +1,188 @@
+from hashlib import md5
+
+from api.coalescing import single_flight
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов (ETag, Last-Modified, ответ 304).
+    Валидаторы вычисляются одним
+    агрегирующим запросом по полю даты изменения, без сериализации ответа.
+    """
+
+    updated_field = 'updated_at'
+
+    def get_validator_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_list_validators(self):
+        state = self.get_validator_queryset().aggregate(
+            last_modified=Max(self.updated_field), count=Count('pk')
+        )
+        return state['last_modified'], state['count']
+
+    def get_detail_validators(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        last_modified = (
+            self.get_validator_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list(self.updated_field, flat=True)
+            .first()
+        )
+        return last_modified, 1
+
+    def conditional_response(self, request, validators, handler):
+        last_modified, count = validators
+        if last_modified is None:
+            return handler()
+        etag = quote_etag(
+            md5(
+                f'{request.get_full_path()}:{last_modified.isoformat()}:'
+                f'{count}'.encode()
+            ).hexdigest()
+        )
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = handler()
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """Условные запросы для получения списка элементов."""
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            self.get_list_validators(),
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """Условные запросы для получения одного элемента."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            self.get_detail_validators(),
+            lambda: super(ConditionalRetrieveMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class CoalescedListMixin:
+    """
+    Одинаковые одновременные запросы списка (тот же URL и заголовки
+    условного запроса) выполняются один раз (api.coalescing), остальные
+    получают данные ответа первого. Ставится в базовых классах перед
+    ConditionalListMixin, чтобы объединялся и запрос валидаторов.
+    """
+
+    coalesced_headers = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+    copied_headers = ('ETag', 'Last-Modified')
+
+    def freeze_response(self, response):
+        return (
+            response.status_code,
+            getattr(response, 'data', None),
+            {
+                name: response[name]
+                for name in self.copied_headers
+                if response.has_header(name)
+            },
+        )
+
+    def list(self, request, *args, **kwargs):
+        key = '\n'.join(
+            [type(self).__name__, request.build_absolute_uri()]
+            + [request.META.get(name, '') for name in self.coalesced_headers]
+        )
+        status_code, data, headers = single_flight.do(
+            key,
+            lambda: self.freeze_response(
+                super(CoalescedListMixin, self).list(request, *args, **kwargs)
+            ),
+        )
+        return Response(data, status=status_code, headers=headers)
+
+
+class MultiGetMixin:
+    """
+    Получение нескольких элементов по списку id (?ids=1,2,3) одним
+    запросом к базе. Остальные фильтры и пагинация не применяются,
+    элементы возвращаются в порядке перечисления id, отсутствующие
+    пропускаются. Длина списка ограничена max_ids. Параметр действует
+    только на список.
+    """
+
+    ids_param = 'ids'
+    max_ids = 100
+
+    def get_requested_ids(self):
+        value = self.request.query_params.get(self.ids_param)
+        if value is None:
+            return None
+        try:
+            ids = [int(part) for part in value.split(',')]
+        except ValueError:
+            raise ValidationError(
+                {self.ids_param: 'Ожидается список целых чисел через запятую.'}
+            )
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.max_ids:
+            raise ValidationError(
+                {self.ids_param: f'Не больше {self.max_ids} id в запросе.'}
+            )
+        return ids
+
+    def filter_queryset(self, queryset):
+        # В остальных действиях параметр ids не учитывается, чтобы
+        # PATCH или DELETE /titles/5/?ids=1 не вернули 404 для объекта 5.
+        if self.action != 'list':
+            return super().filter_queryset(queryset)
+        ids = self.get_requested_ids()
+        if ids is None:
+            return super().filter_queryset(queryset)
+        return queryset.filter(pk__in=ids)
+
+    def list(self, request, *args, **kwargs):
+        ids = self.get_requested_ids()
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        found = {
+            obj.pk: obj
+            for obj in self.filter_queryset(self.get_queryset()).order_by()
+        }
+        serializer = self.get_serializer(
+            [found[pk] for pk in ids if pk in found], many=True
+        )
+        return Response(serializer.data)
+
+
+class AtomicWriteMixin:
+    """
+    Изменяющие запросы выполняются в одной транзакции: изменение объекта
+    и записи, которые добавляют обработчики сигналов (журнал изменений,
+    статистика, счётчики), фиксируются или откатываются вместе.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
@@ -26,7 +26,7 @@ class IsOwnerModeratorAdminOrReadOnly(permissions.BasePermission):
             return True
         return (
             request.user.is_authenticated
-            and (obj.author == request.user)
+            and (obj.author_id == request.user.pk)
             or (request.user.is_admin or request.user.is_moderator)
         )
 
@@ -41,6 +41,18 @@ class IsAdminOnly(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_admin
 
 
+class IsModeratorOrAdmin(permissions.BasePermission):
+    """
+    Доступ к данным есть только у пользователей с ролью 'модератор' или
+    'администратор' и у администраторов проекта.
+    """
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_admin or request.user.is_moderator
+        )
+
+
 class IsProfileOwner(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated
@@ -1,10 +1,32 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (
+    Category,
+    CategoryStats,
+    Change,
+    Comment,
+    Genre,
+    GenreStats,
+    GenreTitle,
+    Review,
+    SimilarTitle,
+    Title,
+    YearStats,
+)
+from reviews.genres import set_title_genres
+from reviews.moderation import MODERATION_ACTIONS, MODERATION_TARGETS
+from reviews.registry import category_registry, genre_registry
 from users.models import User
+from users.validators import (
+    username_name_list_validator,
+    username_pattern_validation,
+)
 
+from .fields import RegistrySlugRelatedField
 from .utils import code_generator
 
 
@@ -21,22 +43,30 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True,
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError(
-                    'Вы не можете добавить более'
-                    'одного отзыва на произведение'
-                )
-        return data
+    def create(self, validated_data):
+        """
+        Единственность отзыва автора на произведение проверяется
+        ограничением unique_review при вставке, а не запросом перед ней:
+        иначе параллельные повторы запроса проходят проверку одновременно.
+        Вставка выполняется в точке сохранения, нарушение ограничения
+        возвращает ошибку 400.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'], author=validated_data['author']
+            ).exists():
+                raise
+        raise ValidationError(
+            'Вы не можете добавить более одного отзыва на произведение'
+        )
 
     class Meta:
         model = Review
         fields = '__all__'
+        read_only_fields = ('is_hidden', 'comment_count')
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -58,12 +88,29 @@ class GenreSerializer(serializers.ModelSerializer):
 
 
 class TitleViewSerializer(serializers.ModelSerializer):
-    genre = GenreSerializer(many=True, required=True)
-    category = CategorySerializer(
-        required=True,
-    )
+    """
+    Сериализатор модели Title для чтения. Категории и жанры берутся из
+    реестров справочников процесса, из базы читаются только связи
+    произведения с жанрами (genretitle_set, загружаются prefetch_related).
+    """
+
+    genre = serializers.SerializerMethodField()
+    category = serializers.SerializerMethodField()
     rating = serializers.IntegerField(read_only=True)
 
+    def get_genre(self, obj):
+        genres = (
+            genre_registry.by_id(link.genre_id)
+            for link in obj.genretitle_set.all()
+        )
+        return [GenreSerializer(genre).data for genre in genres if genre]
+
+    def get_category(self, obj):
+        category = category_registry.by_id(obj.category_id)
+        if category is None:
+            return None
+        return CategorySerializer(category).data
+
     class Meta:
         model = Title
         fields = (
@@ -71,6 +118,7 @@ class TitleViewSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'review_count',
             'description',
             'genre',
             'category',
@@ -80,36 +128,170 @@ class TitleViewSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'review_count',
             'description',
             'genre',
             'category',
         )
 
 
+class TitleDocumentSerializer(TitleViewSerializer):
+    """
+    Сериализатор документа произведения (api.documents). Документ хранится
+    до следующего изменения, поэтому категория и жанры берутся из базы
+    (select_related('category'), prefetch_related('genretitle_set__genre')),
+    а не из копии справочника процесса, которая может быть устаревшей.
+    """
+
+    def get_genre(self, obj):
+        return [
+            GenreSerializer(link.genre).data
+            for link in obj.genretitle_set.all()
+        ]
+
+    def get_category(self, obj):
+        if obj.category is None:
+            return None
+        return CategorySerializer(obj.category).data
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    """Сериализатор похожего произведения."""
+
+    id = serializers.IntegerField(source='similar_id')
+    name = serializers.CharField(source='similar.name')
+    year = serializers.IntegerField(source='similar.year')
+
+    class Meta:
+        model = SimilarTitle
+        fields = ('id', 'name', 'year', 'score')
+
+
 class TitleCreateUpdateSerializer(serializers.ModelSerializer):
     """Сериализатор модели Title (кроме метода GET)."""
 
-    genre = serializers.SlugRelatedField(
+    genre = RegistrySlugRelatedField(
+        genre_registry,
         many=True,
-        queryset=Genre.objects.all(),
-        slug_field='slug',
-    )
-    category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(),
-        slug_field='slug',
     )
+    category = RegistrySlugRelatedField(category_registry)
 
     class Meta:
         fields = ('id', 'name', 'description', 'year', 'category', 'genre')
         model = Title
 
+    def save(self, **kwargs):
+        """
+        Копия справочника в процессе может ещё содержать удалённые жанр
+        или категорию. Отдельной проверки перед записью нет: внешние ключи
+        проверяются сразу после неё (в PostgreSQL connection.check_constraints
+        переключает отложенные ограничения без чтения таблиц), а при
+        нарушении справочники сбрасываются и возвращается 400.
+        """
+        try:
+            with transaction.atomic():
+                title = super().save(**kwargs)
+                connection.check_constraints(
+                    table_names=[
+                        Title._meta.db_table,
+                        GenreTitle._meta.db_table,
+                    ]
+                )
+        except IntegrityError:
+            errors = self.deleted_references()
+            if not errors:
+                raise
+            raise ValidationError(errors)
+        return title
+
+    def deleted_references(self):
+        """Поля, ссылающиеся на удалённые жанры или категорию."""
+        errors = {}
+        for field, registry in (
+            ('category', category_registry),
+            ('genre', genre_registry),
+        ):
+            registry.expire()
+            value = self.validated_data.get(field)
+            if value is None:
+                continue
+            pks = {obj.pk for obj in (value if field == 'genre' else [value])}
+            if registry.queryset.filter(pk__in=pks).count() < len(pks):
+                errors[field] = ['Указанный объект удалён.']
+        return errors
+
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        title = super().create(validated_data)
+        set_title_genres(title, [genre.pk for genre in genres])
+        return title
+
+    def update(self, instance, validated_data):
+        """
+        Жанры обновляются по разнице с текущими связями
+        (reviews.genres.set_title_genres) вместо M2M .set().
+        """
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            set_title_genres(title, [genre.pk for genre in genres])
+        return title
+
 
 class ConfirmationCodeSerializer(serializers.ModelSerializer):
-    """Сериализатор для отправки пользователю кода подтверждения."""
+    """
+    Сериализатор для отправки пользователю кода подтверждения.
+    Уникальность имени и почты не проверяется отдельными запросами:
+    пользователь сразу создаётся, а при нарушении ограничений уникальности
+    выполняется один запрос, определяющий, существует ли уже такой
+    пользователь или данные заняты другими пользователями.
+    """
+
+    created = False
 
     class Meta:
         model = User
         fields = ('username', 'email')
+        extra_kwargs = {
+            'username': {
+                'validators': [
+                    username_pattern_validation,
+                    username_name_list_validator,
+                ]
+            },
+            'email': {'validators': []},
+        }
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                user = User.objects.create(**validated_data)
+        except IntegrityError:
+            return self.get_existing_user(validated_data)
+        self.created = True
+        return user
+
+    def get_existing_user(self, validated_data):
+        username = validated_data['username']
+        email = validated_data['email']
+        users = User.objects.filter(Q(username=username) | Q(email=email))
+        errors = {}
+        for user in users:
+            if user.username == username and user.email == email:
+                return user
+            for field in ('username', 'email'):
+                if getattr(user, field) == validated_data[field]:
+                    errors[field] = [self.get_unique_error_message(field)]
+        raise ValidationError(errors)
+
+    @staticmethod
+    def get_unique_error_message(field_name):
+        """Текст ошибки, совпадающий с сообщением UniqueValidator."""
+        model_field = User._meta.get_field(field_name)
+        return model_field.error_messages['unique'] % {
+            'model_name': User._meta.verbose_name,
+            'field_label': model_field.verbose_name,
+        }
 
 
 class EmailAuthSerializer(serializers.Serializer):
@@ -169,3 +351,114 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = '__all__'
+        read_only_fields = ('is_hidden',)
+
+
+class GenreStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики жанра."""
+
+    name = serializers.CharField(source='genre.name')
+    slug = serializers.CharField(source='genre.slug')
+    rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = GenreStats
+        fields = ('name', 'slug', 'titles_count', 'reviews_count', 'rating')
+
+
+class CategoryStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики категории."""
+
+    name = serializers.CharField(source='category.name')
+    slug = serializers.CharField(source='category.slug')
+    rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = CategoryStats
+        fields = ('name', 'slug', 'titles_count', 'reviews_count', 'rating')
+
+
+class YearStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики года выпуска."""
+
+    rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = YearStats
+        fields = ('year', 'titles_count', 'reviews_count', 'rating')
+
+
+class ReviewVolumeSerializer(serializers.Serializer):
+    """Сериализатор количества отзывов за период."""
+
+    period = serializers.DateField()
+    reviews_count = serializers.IntegerField()
+
+
+class ModerationSerializer(serializers.Serializer):
+    """
+    Сериализатор массовой модерации: условия отбора отзывов и
+    комментариев и действие над ними.
+    """
+
+    target = serializers.ChoiceField(
+        choices=MODERATION_TARGETS, default='all'
+    )
+    action = serializers.ChoiceField(choices=MODERATION_ACTIONS)
+    author = serializers.SlugRelatedField(
+        slug_field='username',
+        queryset=User.objects.all(),
+        required=False,
+    )
+    text_contains = serializers.CharField(
+        required=False, min_length=3, max_length=200
+    )
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if not any(key in data for key in ('author', 'text_contains', 'ids')):
+            raise ValidationError(
+                'Укажите хотя бы одно условие отбора: '
+                'author, text_contains или ids.'
+            )
+        if 'ids' in data and data['target'] == 'all':
+            raise ValidationError(
+                {
+                    'ids': 'Для отбора по ids укажите target '
+                    'reviews или comments.'
+                }
+            )
+        return data
+
+    def get_filters(self):
+        """Условия отбора для журнала модерации."""
+        filters = {
+            key: value
+            for key, value in self.validated_data.items()
+            if key in ('target', 'text_contains', 'ids')
+        }
+        if 'author' in self.validated_data:
+            filters['author'] = self.validated_data['author'].username
+        return filters
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    """Запись журнала изменений; позиция записи служит курсором."""
+
+    class Meta:
+        model = Change
+        fields = (
+            'id',
+            'position',
+            'model',
+            'object_id',
+            'parent_id',
+            'action',
+            'created',
+        )
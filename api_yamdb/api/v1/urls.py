@@ -4,13 +4,22 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 
 from .serializers import EmailAuthSerializer
 from .views import (
+    CategoryStatsViewSet,
     CategoryViewSet,
+    ChangeFeedView,
+    CoalescingStatsView,
     CommentViewSet,
     ConfirmationCodeView,
+    GenreStatsViewSet,
     GenreViewSet,
+    ModerationView,
+    ProfileReportViewSet,
     ReviewViewSet,
+    ReviewVolumeViewSet,
+    SuggestView,
     TitleViewSet,
     UserViewSet,
+    YearStatsViewSet,
 )
 
 app_name = 'api_v1'
@@ -29,6 +38,17 @@ router.register(
     basename='comments',
 )
 router.register('users', UserViewSet, basename='users')
+router.register('stats/genres', GenreStatsViewSet, basename='stats_genres')
+router.register(
+    'stats/categories', CategoryStatsViewSet, basename='stats_categories'
+)
+router.register('stats/years', YearStatsViewSet, basename='stats_years')
+router.register(
+    'stats/reviews', ReviewVolumeViewSet, basename='stats_reviews'
+)
+router.register(
+    'debug/profiles', ProfileReportViewSet, basename='debug_profiles'
+)
 
 auth_patterns = [
     path('signup/', ConfirmationCodeView.as_view(), name='user_obtain_code'),
@@ -42,4 +62,14 @@ auth_patterns = [
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/', include(auth_patterns)),
+    path(
+        'search/suggest/', SuggestView.as_view(), name='search_suggest'
+    ),
+    path('moderation/', ModerationView.as_view(), name='moderation'),
+    path('changes/', ChangeFeedView.as_view(), name='changes'),
+    path(
+        'debug/coalescing/',
+        CoalescingStatsView.as_view(),
+        name='debug_coalescing',
+    ),
 ]
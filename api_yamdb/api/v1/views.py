@@ -1,52 +1,111 @@
-from django.db.models import Avg
+from api.coalescing import single_flight
+from api.documents import title_document
+from api.profiling import REPORT_ID_PATTERN, list_reports, load_report
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncYear
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from reviews.models import Category, Genre, Review, Title
+from reviews.changes import assign_positions, compaction_horizon
+from reviews.models import (
+    RATING_ORDERING,
+    Category,
+    CategoryStats,
+    Change,
+    Genre,
+    GenreStats,
+    Review,
+    ReviewVolume,
+    SimilarTitle,
+    Title,
+    YearStats,
+)
+from reviews.moderation import matched_querysets, moderate
+from reviews.purge import schedule_purge
+from reviews.suggest import suggest_index
 from users.models import User
 
-from .filters import TitleFilter
+from .filters import IndexedOrderingFilter, TitleFilter
+from .mixins import (
+    AtomicWriteMixin,
+    CoalescedListMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    MultiGetMixin,
+)
 from .permissions import (
     IsAdminOnly,
     IsAdminOrReadOnly,
+    IsModeratorOrAdmin,
     IsOwnerModeratorAdminOrReadOnly,
     IsProfileOwner,
 )
 from .serializers import (
     CategorySerializer,
+    CategoryStatsSerializer,
+    ChangeSerializer,
     CommentSerializer,
     ConfirmationCodeSerializer,
     GenreSerializer,
+    GenreStatsSerializer,
+    ModerationSerializer,
     ReviewSerializer,
+    ReviewVolumeSerializer,
+    SimilarTitleSerializer,
     TitleCreateUpdateSerializer,
     TitleViewSerializer,
     UserSerializer,
+    YearStatsSerializer,
 )
 from .utils import code_generator, confirmation_code_email
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    AtomicWriteMixin,
+    CoalescedListMixin,
+    ConditionalListMixin,
+    MultiGetMixin,
+    viewsets.ModelViewSet,
+):
     """
     Эндпоинт для работы с моделью Title.
     Разрешено частичное обновление, добавление, удаление,
     получение списка всех элементов и одного элемента.
     Доступен всем для чтения и администратору для модификации.
-    Подключена фильтрация по полям: category, genre, name, year.
+    Подключена фильтрация по полям: category, genre (несколько значений
+    через запятую), name, year, диапазону лет и минимальному рейтингу,
+    и сортировка по названию, году, рейтингу, количеству отзывов и id
+    (по умолчанию новые первыми). Рейтинг хранится в самом произведении.
+    С параметром ids возвращаются произведения из списка id.
+    Одинаковые одновременные запросы списка выполняются один раз.
+    Одно произведение отдаётся готовым документом (api.documents).
     """
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.filter(is_deleted=False)
+    lookup_value_regex = r'\d+'
     serializer_class = TitleCreateUpdateSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, IndexedOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('name', 'year', 'rating', 'review_count', 'id')
+    ordering_expressions = {'rating': RATING_ORDERING}
+    ordering = ('-id',)
     http_method_names = ['patch', 'get', 'post', 'delete']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            return queryset.prefetch_related('genretitle_set')
+        return queryset
+
     def get_serializer_class(self):
         """Определяет какой сериализатор будет использоваться
         для разных типов запроса."""
@@ -54,8 +113,45 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleViewSerializer
         return TitleCreateUpdateSerializer
 
+    def perform_destroy(self, instance):
+        """Отзывы и комментарии удаляются в фоне командой purge_deleted."""
+        schedule_purge(Title.objects.filter(pk=instance.pk))
+
+    def retrieve(self, request, pk=None):
+        """
+        Готовый JSON-документ произведения отдаётся как есть, без
+        сериализации. Дата обновления документа служит валидатором
+        условного запроса.
+        """
+        document = title_document(int(pk))
+        if document is None:
+            raise NotFound('Произведение не найдено.')
+        body, updated_at = document
+        return self.conditional_response(
+            request,
+            (updated_at, 1),
+            lambda: HttpResponse(bytes(body), content_type='application/json'),
+        )
+
+    @action(methods=['get'], detail=True)
+    def similar(self, request, pk=None):
+        """
+        Похожие произведения, заранее рассчитанные командой
+        build_similar_titles. Для отсутствующего или удалённого
+        произведения возвращается 404, как и в retrieve.
+        """
+        if not Title.objects.filter(pk=pk, is_deleted=False).exists():
+            raise NotFound('Произведение не найдено.')
+        similar = SimilarTitle.objects.filter(
+            title_id=pk, similar__is_deleted=False
+        ).select_related('similar')
+        serializer = SimilarTitleSerializer(similar, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 class ListCreateDestroyViewSet(
+    AtomicWriteMixin,
+    ConditionalListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -109,27 +205,57 @@ class ConfirmationCodeView(APIView):
     permission_classes = (permissions.AllowAny,)
 
     def post(self, request):
-        username = request.data.get("username")
-        email = request.data.get("email")
-        user = User.objects.filter(username=username, email=email)
-        if username:
-            confirmation_code = code_generator(username)
-        if user:
-            confirmation_code_email(email, confirmation_code)
+        serializer = ConfirmationCodeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.save()
+        confirmation_code_email(user.email, code_generator(user.username))
+        if not serializer.created:
             return Response(
                 ({'message': 'Письмо успешно отправлено'}, request.data),
                 status=status.HTTP_200_OK,
             )
-        serializer = ConfirmationCodeSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        if serializer.is_valid():
-            serializer.save()
-            confirmation_code_email(email, confirmation_code)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class SuggestView(APIView):
+    """
+    Подсказки для строки поиска по названиям произведений, жанров и
+    категорий. Ответ формируется из индекса в памяти процесса без
+    обращения к базе данных, поэтому аутентификация не выполняется.
+    """
+
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+    default_limit = 10
+    max_limit = 50
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get(self, request):
+        entries = suggest_index.suggest(
+            request.query_params.get('q', '').strip(), self.get_limit()
+        )
+        return Response(
+            [
+                {
+                    'type': kind,
+                    'id' if kind == 'title' else 'slug': ident,
+                    'name': name,
+                }
+                for kind, ident, name in entries
+            ],
+            status=status.HTTP_200_OK,
+        )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    ConditionalListMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet
+):
     """
     Эндпоинт для управления пользователями.
     Можно осуществлять добавление и поиск по пользователям.
@@ -137,7 +263,7 @@ class UserViewSet(viewsets.ModelViewSet):
     /me/.
     """
 
-    queryset = User.objects.all()
+    queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = (IsAdminOnly, permissions.IsAuthenticated)
     filter_backends = (filters.SearchFilter,)
@@ -161,28 +287,41 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = UserSerializer(request.user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def perform_destroy(self, instance):
+        """Отзывы и комментарии удаляются в фоне командой purge_deleted."""
+        schedule_purge(User.objects.filter(pk=instance.pk))
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    """ViewSet для отправки отзывов."""
+
+class ReviewViewSet(
+    AtomicWriteMixin, MultiGetMixin, viewsets.ModelViewSet
+):
+    """
+    ViewSet для отправки отзывов.
+    С параметром ids возвращаются отзывы произведения из списка id.
+    """
 
     serializer_class = ReviewSerializer
     permission_classes = [
         IsOwnerModeratorAdminOrReadOnly,
         IsAuthenticatedOrReadOnly,
     ]
+    filter_backends = (filters.OrderingFilter,)
+    ordering_fields = ('pub_date', 'comment_count')
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
+        title = get_object_or_404(
+            Title, pk=self.kwargs.get("title_id"), is_deleted=False
+        )
 
-        return title.reviews.all()
+        return title.reviews.filter(is_hidden=False).select_related('author')
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
+        title = get_object_or_404(Title, id=title_id, is_deleted=False)
         serializer.save(author=self.request.user, title=title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(AtomicWriteMixin, viewsets.ModelViewSet):
     """ViewSet для отправки комментария."""
 
     serializer_class = CommentSerializer
@@ -196,11 +335,214 @@ class CommentViewSet(viewsets.ModelViewSet):
             Review,
             id=self.kwargs.get("review_id"),
             title__id=self.kwargs.get("title_id"),
+            title__is_deleted=False,
+            is_hidden=False,
+        )
+        return review.comments.filter(is_hidden=False).select_related(
+            'author'
         )
-        return review.comments.all()
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get('title_id')
         review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
+        review = get_object_or_404(
+            Review,
+            id=review_id,
+            title=title_id,
+            title__is_deleted=False,
+            is_hidden=False,
+        )
         serializer.save(author=self.request.user, review=review)
+
+
+class ModerationView(APIView):
+    """
+    Массовая модерация отзывов и комментариев: удаление или скрытие всех
+    объектов, отобранных по автору, фрагменту текста или списку id.
+    Изменения выполняются пакетными запросами и записываются в журнал.
+    С параметром dry_run возвращается только количество объектов.
+    Доступен модераторам и администраторам.
+    """
+
+    permission_classes = (IsModeratorOrAdmin,)
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        reviews, comments = matched_querysets(
+            data['target'],
+            author=data.get('author'),
+            text_contains=data.get('text_contains'),
+            ids=data.get('ids'),
+        )
+        counts = moderate(
+            reviews,
+            comments,
+            data['action'],
+            data['dry_run'],
+            request.user,
+            serializer.get_filters(),
+        )
+        return Response(
+            dict(counts, action=data['action'], dry_run=data['dry_run']),
+            status=status.HTTP_200_OK,
+        )
+
+
+class ChangeFeedView(APIView):
+    """
+    Журнал изменений каталога для инкрементальной синхронизации.
+    Возвращает записи с позицией больше курсора since по возрастанию
+    позиции и курсор для следующего запроса. Позиции назначаются
+    зафиксированным записям перед чтением (assign_positions), поэтому
+    запись долгой транзакции не окажется позади выданного курсора.
+    Если журнал сжат после курсора, возвращается 410 и потребителю
+    нужна полная синхронизация, после которой журнал читается с курсора
+    next — границы сжатия: записи после неё не удаляются, а замещённые
+    записи потребитель получит в более поздних. Доступен всем для чтения.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+    default_limit = 100
+    max_limit = 1000
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_since(self):
+        try:
+            since = int(self.request.query_params.get('since', 0))
+        except ValueError:
+            since = -1
+        if since < 0:
+            raise ValidationError(
+                {'since': 'Ожидается неотрицательное целое число.'}
+            )
+        return since
+
+    def get(self, request):
+        since = self.get_since()
+        horizon = compaction_horizon()
+        if since < horizon:
+            return Response(
+                {
+                    'detail': 'Записи после курсора удалены при сжатии '
+                    'журнала, нужна полная синхронизация.',
+                    'next': horizon,
+                },
+                status=status.HTTP_410_GONE,
+            )
+        limit = self.get_limit()
+        assign_positions()
+        changes = list(
+            Change.objects.filter(position__gt=since).order_by('position')[
+                : limit + 1
+            ]
+        )
+        return Response(
+            {
+                'next': changes[:limit][-1].position if changes else since,
+                'has_more': len(changes) > limit,
+                'results': ChangeSerializer(changes[:limit], many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ProfileReportViewSet(viewsets.ViewSet):
+    """
+    Отчёты профилирования запросов (api.profiling): список последних
+    отчётов и полный отчёт по id. Доступны только администраторам.
+    """
+
+    permission_classes = (IsAdminOnly,)
+    lookup_value_regex = REPORT_ID_PATTERN
+
+    def list(self, request):
+        return Response(list_reports())
+
+    def retrieve(self, request, pk):
+        report = load_report(pk)
+        if report is None:
+            raise NotFound('Отчёт не найден.')
+        return Response(report)
+
+
+class CoalescingStatsView(APIView):
+    """
+    Счётчики объединения запросов (api.coalescing) текущего процесса:
+    выполненные и объединённые вычисления. Доступны только
+    администраторам.
+    """
+
+    permission_classes = (IsAdminOnly,)
+
+    def get(self, request):
+        return Response(single_flight.snapshot())
+
+
+class StatsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Базовый класс эндпоинтов статистики каталога. Данные читаются из
+    сводных таблиц (reviews.stats) без агрегации отзывов при запросе.
+    Доступен всем для чтения.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+    pagination_class = None
+
+
+class GenreStatsViewSet(StatsViewSet):
+    """Количество произведений, отзывов и средняя оценка по жанрам."""
+
+    queryset = GenreStats.objects.select_related('genre').order_by(
+        'genre__name'
+    )
+    serializer_class = GenreStatsSerializer
+
+
+class CategoryStatsViewSet(StatsViewSet):
+    """Количество произведений, отзывов и средняя оценка по категориям."""
+
+    queryset = CategoryStats.objects.select_related('category').order_by(
+        'category__name'
+    )
+    serializer_class = CategoryStatsSerializer
+
+
+class YearStatsViewSet(StatsViewSet):
+    """Количество произведений, отзывов и средняя оценка по годам."""
+
+    queryset = YearStats.objects.all()
+    serializer_class = YearStatsSerializer
+
+
+class ReviewVolumeViewSet(StatsViewSet):
+    """
+    Количество опубликованных отзывов по дням, месяцам или годам.
+    Период задаётся параметром period: day (по умолчанию), month, year.
+    """
+
+    serializer_class = ReviewVolumeSerializer
+    periods = {
+        'day': F('day'),
+        'month': TruncMonth('day'),
+        'year': TruncYear('day'),
+    }
+
+    def get_queryset(self):
+        period = self.request.query_params.get('period', 'day')
+        if period not in self.periods:
+            raise ValidationError(
+                {'period': f'Допустимые значения: {", ".join(self.periods)}.'}
+            )
+        return (
+            ReviewVolume.objects.values(period=self.periods[period])
+            .annotate(reviews_count=Sum('reviews_count'))
+            .order_by('period')
+        )
@@ -0,0 +1,91 @@
+from django.contrib import admin
+from django.contrib.auth import get_permission_codename
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from reviews.purge import delete_in_chunks
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц. Для нефильтрованной выборки в PostgreSQL
+    количество строк берётся из статистики планировщика (pg_class.reltuples)
+    вместо полного COUNT(*). Небольшие таблицы и отфильтрованные выборки
+    считаются как обычно.
+    """
+
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return int(row[0])
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Базовый класс админки для больших таблиц: оценка количества строк,
+    без повторного COUNT(*) для отфильтрованного списка и без стандартного
+    удаления, которое загружает все связанные объекты в память. Страница
+    удаления объекта не обходит связи сборщиком каскада, а удаляет объект
+    через delete_queryset: по умолчанию пакетами (purge.delete_in_chunks),
+    модели с зависимыми строками переопределяют этот метод и перечисляют
+    модели удаляемых вместе с объектом строк в cascade_models: для
+    удаления нужно право удалять и их (как у стандартного удаления).
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    cascade_models = ()
+
+    def cascade_perms_needed(self, request):
+        """Модели удаляемых вместе с объектом строк, которые удалять нельзя."""
+        perms_needed = set()
+        for model in self.cascade_models:
+            opts = model._meta
+            model_admin = self.admin_site._registry.get(model)
+            if model_admin is not None:
+                allowed = model_admin.has_delete_permission(request)
+            else:
+                allowed = request.user.has_perm(
+                    f'{opts.app_label}.'
+                    f'{get_permission_codename("delete", opts)}'
+                )
+            if not allowed:
+                perms_needed.add(opts.verbose_name)
+        return perms_needed
+
+    def has_delete_cascade_permission(self, request):
+        """Право для действий, удаляющих объекты со связанными строками."""
+        if not self.has_delete_permission(request):
+            return False
+        return not self.cascade_perms_needed(request)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        return (
+            [str(obj) for obj in objs],
+            {self.model._meta.verbose_name_plural: len(objs)},
+            self.cascade_perms_needed(request),
+            [],
+        )
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, self.model.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_in_chunks(queryset)
@@ -35,14 +35,30 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'api.middleware.BrowserOnlyMiddleware',
+    'api.idempotency.IdempotencyMiddleware',
+    'api.profiling.ProfilingMiddleware',
+    'api.nplusone.NPlusOneMiddleware',
+]
+
+# Выполняются внутри BrowserOnlyMiddleware и только для путей вне
+# STATELESS_PATH_PREFIXES: API аутентифицируется по JWT, сессии, CSRF и
+# сообщения нужны лишь админке.
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+STATELESS_PATH_PREFIXES = ('/api/',)
+
+# Проверки админки ищут эти middleware только в MIDDLEWARE, а они
+# подключены через BROWSER_MIDDLEWARE.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -79,6 +95,24 @@ DATABASES = {
 }
 
 
+# Общий для процессов кэш (memcached): версии реестров справочников и
+# индекса подсказок (reviews.local_cache) должны доходить до всех
+# воркеров. Адрес задаётся переменной CACHE_LOCATION (host:port); без неё
+# используется кэш в памяти процесса, подходящий только для разработки
+# и тестов: изменения из других процессов видны не раньше max_age.
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_LOCATION,
+    }
+    if CACHE_LOCATION
+    else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -116,6 +150,10 @@ STATIC_URL = '/static/'
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'assets')]
+
+STATICFILES_STORAGE = 'api_yamdb.storage.CompressedManifestStaticFilesStorage'
+
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -144,14 +182,52 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Исходные CSV для load_data_from_csv лежат вне STATIC_ROOT, чтобы не
+# попадать в результат collectstatic.
+CSV_DATA_DIR = BASE_DIR / 'data'
+
 PATH_CSV_FILES = {
-    'category': str(BASE_DIR.joinpath('static/data/category.csv')),
-    'genre': str(BASE_DIR.joinpath('static/data/genre.csv')),
-    'title': str(BASE_DIR.joinpath('static/data/titles.csv')),
-    'genretitle': str(BASE_DIR.joinpath('static/data/genre_title.csv')),
-    'user': str(BASE_DIR.joinpath('static/data/users.csv')),
-    'review': str(BASE_DIR.joinpath('static/data/review.csv')),
-    'comment': str(BASE_DIR.joinpath('static/data/comments.csv')),
+    'category': str(CSV_DATA_DIR.joinpath('category.csv')),
+    'genre': str(CSV_DATA_DIR.joinpath('genre.csv')),
+    'title': str(CSV_DATA_DIR.joinpath('titles.csv')),
+    'genretitle': str(CSV_DATA_DIR.joinpath('genre_title.csv')),
+    'user': str(CSV_DATA_DIR.joinpath('users.csv')),
+    'review': str(CSV_DATA_DIR.joinpath('review.csv')),
+    'comment': str(CSV_DATA_DIR.joinpath('comments.csv')),
+}
+
+PROFILING = {
+    'HEADER': 'HTTP_X_PROFILE',
+    'SAMPLE_RATE': float(os.getenv('PROFILING_SAMPLE_RATE', 0)),
+    'REPORTS_DIR': BASE_DIR / 'profiles',
+    'MAX_REPORTS': 50,
+    'EXPLAIN_QUERIES': 5,
+    'PROFILE_LINES': 40,
+}
+
+ARCHIVE_DIR = BASE_DIR / 'archive'
+
+IDEMPOTENCY = {
+    'HEADER': 'HTTP_IDEMPOTENCY_KEY',
+    'METHODS': ('POST', 'PUT', 'PATCH', 'DELETE'),
+    'TTL': 24 * 60 * 60,
+    'LOCK_TIMEOUT': 60,
+    # Ответы этих эндпоинтов содержат учётные данные и не сохраняются.
+    'EXCLUDED_PATHS': ('/api/v1/auth/token/',),
+}
+
+COALESCING = {
+    'ENABLED': True,
+    'CROSS_WORKER': os.getenv('COALESCING_CROSS_WORKER', '') == '1',
+    'WAIT_TIMEOUT': 5,
+    'RESULT_TTL': 5,
+    'POLL_INTERVAL': 0.02,
+}
+
+NPLUSONE = {
+    'ENABLED': True,
+    'THRESHOLD': 5,
+    'RAISE': False,
 }
 
 DEFAULT_EMAIL_SENDER_ADDRESS = 'no-reply@yamdb.com'
@@ -0,0 +1,67 @@
+import gzip
+import io
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_EXTENSIONS = (
+    '.css',
+    '.html',
+    '.js',
+    '.json',
+    '.map',
+    '.svg',
+    '.txt',
+    '.xml',
+    '.yaml',
+)
+COMPRESS_MIN_SIZE = 256
+
+
+def gzip_compress(content):
+    # Нулевое время модификации делает архив воспроизводимым.
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+        fileobj=buffer, mode='wb', compresslevel=9, mtime=0
+    ) as file:
+        file.write(content)
+    return buffer.getvalue()
+
+
+COMPRESSORS = [('.gz', gzip_compress)]
+if brotli is not None:
+    COMPRESSORS.append(('.br', brotli.compress))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики: collectstatic сохраняет копии файлов с хэшем
+    содержимого в имени, а рядом с текстовыми файлами — сжатые версии
+    .gz (и .br, если установлен пакет brotli). Nginx отдаёт их через
+    gzip_static без сжатия на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name, hashed_name in self.hashed_files.items():
+            if name.endswith(COMPRESSED_EXTENSIONS):
+                self.compress(name)
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            content = file.read()
+        if len(content) < COMPRESS_MIN_SIZE:
+            return
+        for extension, compressor in COMPRESSORS:
+            compressed = compressor(content)
+            if len(compressed) < len(content):
+                with open(path + extension, 'wb') as file:
+                    file.write(compressed)
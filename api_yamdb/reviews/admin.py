@@ -1,11 +1,57 @@
+from api_yamdb.admin_tools import LargeTableAdmin
 from django.contrib import admin
 
-from .models import Category, Genre, Title
+from .models import (
+    Category,
+    ChangeCompaction,
+    Comment,
+    Genre,
+    GenreTitle,
+    ModerationLog,
+    PurgeJob,
+    Review,
+    Title,
+)
+from .purge import delete_in_chunks, schedule_purge
+
+
+class GenreTitleInline(admin.TabularInline):
+    model = GenreTitle
+    autocomplete_fields = ('genre',)
+    extra = 0
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'description', 'year', 'category')
+class TitleAdmin(LargeTableAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'description',
+        'year',
+        'category',
+        'review_count',
+    )
+    list_select_related = ('category',)
+    list_filter = ('is_deleted', 'category')
+    readonly_fields = ('review_count',)
+    search_fields = ('name',)
+    autocomplete_fields = ('category',)
+    inlines = (GenreTitleInline,)
+    actions = ('purge_selected',)
+    cascade_models = (GenreTitle, Review, Comment)
+
+    def delete_queryset(self, request, queryset):
+        return schedule_purge(queryset)
+
+    @admin.action(
+        description='Удалить выбранные произведения в фоне',
+        permissions=['delete_cascade'],
+    )
+    def purge_selected(self, request, queryset):
+        count = self.delete_queryset(request, queryset)
+        self.message_user(
+            request, f'Поставлено в очередь на удаление: {count}.'
+        )
 
 
 @admin.register(Category)
@@ -15,6 +61,7 @@ class CategoryAdmin(admin.ModelAdmin):
         'name',
         'slug',
     )
+    search_fields = ('name', 'slug')
 
 
 @admin.register(Genre)
@@ -24,3 +71,100 @@ class GenreAdmin(admin.ModelAdmin):
         'name',
         'slug',
     )
+    search_fields = ('name', 'slug')
+
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    list_display = (
+        'pk',
+        'title',
+        'author',
+        'score',
+        'pub_date',
+        'comment_count',
+    )
+    list_select_related = ('title', 'author')
+    list_filter = ('score', 'is_hidden')
+    readonly_fields = ('comment_count',)
+    search_fields = ('=author__username', 'title__name')
+    autocomplete_fields = ('title', 'author')
+    actions = ('delete_with_comments',)
+    cascade_models = (Comment,)
+
+    def delete_queryset(self, request, queryset):
+        comments = delete_in_chunks(
+            Comment.objects.filter(review__in=queryset.values('pk'))
+        )
+        return delete_in_chunks(queryset), comments
+
+    @admin.action(
+        description='Удалить выбранные отзывы с комментариями',
+        permissions=['delete_cascade'],
+    )
+    def delete_with_comments(self, request, queryset):
+        reviews, comments = self.delete_queryset(request, queryset)
+        self.message_user(
+            request,
+            f'Удалено отзывов: {reviews}, комментариев: {comments}.',
+        )
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('pk', 'review', 'author', 'pub_date')
+    list_select_related = ('review', 'author')
+    list_filter = ('is_hidden',)
+    search_fields = ('=author__username',)
+    autocomplete_fields = ('review', 'author')
+    actions = ('delete_fast',)
+
+    @admin.action(
+        description='Удалить выбранные комментарии',
+        permissions=['delete_cascade'],
+    )
+    def delete_fast(self, request, queryset):
+        count = delete_in_chunks(queryset)
+        self.message_user(request, f'Удалено комментариев: {count}.')
+
+
+@admin.register(PurgeJob)
+class PurgeJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'target',
+        'object_id',
+        'created',
+        'finished',
+        'deleted_rows',
+    )
+    list_filter = ('target',)
+    readonly_fields = list_display
+
+
+@admin.register(ModerationLog)
+class ModerationLogAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'moderator',
+        'action',
+        'filters',
+        'reviews_count',
+        'comments_count',
+        'created',
+    )
+    list_select_related = ('moderator',)
+    list_filter = ('action',)
+    readonly_fields = list_display
+
+
+@admin.register(ChangeCompaction)
+class ChangeCompactionAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'horizon',
+        'superseded_rows',
+        'expired_rows',
+        'created',
+    )
+    readonly_fields = list_display
@@ -0,0 +1,307 @@
+import gzip
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Review
+from .purge import CHUNK_HOOKS, PURGE_CHUNK_SIZE, delete_in_chunks
+
+PARTITION_KEY = 'pub_date'
+PARTITION_MONTHS_AHEAD = 3
+# Отзывы не секционируются: ограничение unique_review и внешний ключ
+# комментариев требуют уникальности без ключа секционирования.
+PARTITIONED_MODELS = (Comment,)
+PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+# Выгрузка держится в памяти до этого размера, дальше — во временном файле.
+DUMP_BUFFER_SIZE = 16 * 1024 * 1024
+
+
+def month_start(value, months=0):
+    """Начало месяца (UTC), отстоящего от value на months месяцев."""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _ids_sql(pks):
+    return ', '.join(str(int(pk)) for pk in pks)
+
+
+def is_partitioned(model):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def partitions(model):
+    """Секции таблицы модели: пары (имя, верхняя граница) по возрастанию."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) '
+            'FROM pg_inherits JOIN pg_class child ON child.oid = inhrelid '
+            'WHERE inhparent = to_regclass(%s)',
+            [model._meta.db_table],
+        )
+        rows = cursor.fetchall()
+    return sorted(
+        (
+            (name, parse_datetime(PARTITION_UPPER_BOUND.search(bound)[1]))
+            for name, bound in rows
+        ),
+        key=lambda partition: partition[1],
+    )
+
+
+def create_partitions(model, months_ahead=PARTITION_MONTHS_AHEAD):
+    """
+    Создаёт месячные секции от последней существующей до months_ahead
+    месяцев вперёд. Возвращает имена созданных секций.
+    """
+    table = model._meta.db_table
+    existing = partitions(model)
+    start = existing[-1][1] if existing else month_start(timezone.now())
+    last = month_start(timezone.now(), months_ahead + 1)
+    created = []
+    with connection.cursor() as cursor:
+        while start < last:
+            end = month_start(start, 1)
+            name = f'{table}_{start:%Y_%m}'
+            cursor.execute(
+                f'CREATE TABLE {_quote(name)} PARTITION OF {_quote(table)} '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+            created.append(name)
+            start = end
+    return created
+
+
+def partition_table(model, months_ahead=PARTITION_MONTHS_AHEAD):
+    """
+    Переводит таблицу модели в секционированную по месяцам pub_date
+    (только PostgreSQL). Строки не копируются: прежняя таблица становится
+    секцией до начала следующего месяца. Первичный ключ дополняется
+    ключом секционирования, индексы и внешние ключи создаются на новой
+    таблице, ORM продолжает обращаться к ней по прежнему имени.
+    """
+    table = model._meta.db_table
+    legacy = f'{table}_legacy'
+    pk_column = model._meta.pk.column
+    with transaction.atomic(), connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+        if any(
+            constraint['unique'] and not constraint['primary_key']
+            for constraint in constraints.values()
+        ):
+            raise ValueError(
+                f'Таблица {table} содержит ограничения уникальности '
+                f'без {PARTITION_KEY} и не может быть секционирована.'
+            )
+        primary_key = next(
+            name
+            for name, constraint in constraints.items()
+            if constraint['primary_key']
+        )
+        cursor.execute(
+            'SELECT pg_get_serial_sequence(%s, %s)', [table, pk_column]
+        )
+        sequence = cursor.fetchone()[0]
+        cursor.execute(
+            f'ALTER TABLE {_quote(table)} RENAME TO {_quote(legacy)}'
+        )
+        cursor.execute(
+            f'ALTER TABLE {_quote(legacy)} '
+            f'DROP CONSTRAINT {_quote(primary_key)}'
+        )
+        cursor.execute(
+            f'CREATE TABLE {_quote(table)} (LIKE {_quote(legacy)} '
+            f'INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ({_quote(PARTITION_KEY)})'
+        )
+        cursor.execute(
+            f'ALTER SEQUENCE {sequence} '
+            f'OWNED BY {_quote(table)}.{_quote(pk_column)}'
+        )
+        cursor.execute(
+            f'ALTER TABLE {_quote(table)} ADD CONSTRAINT '
+            f'{_quote(primary_key)} PRIMARY KEY '
+            f'({_quote(pk_column)}, {_quote(PARTITION_KEY)})'
+        )
+        for constraint in constraints.values():
+            columns = ', '.join(map(_quote, constraint['columns']))
+            if constraint['foreign_key']:
+                cursor.execute(
+                    f'ALTER TABLE {_quote(table)} ADD FOREIGN KEY '
+                    f'({columns}) REFERENCES '
+                    f'{_quote(constraint["foreign_key"][0])} '
+                    f'({_quote(constraint["foreign_key"][1])}) '
+                    f'DEFERRABLE INITIALLY DEFERRED'
+                )
+            elif constraint['index'] and not constraint['primary_key']:
+                cursor.execute(
+                    f'CREATE INDEX ON {_quote(table)} ({columns})'
+                )
+        cursor.execute(
+            f'ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(legacy)} '
+            f'FOR VALUES FROM (MINVALUE) TO (%s)',
+            [month_start(timezone.now(), 1)],
+        )
+        create_partitions(model, months_ahead)
+
+
+class DumpArchive:
+    """
+    Архив в сжатых файлах CSV, по одному на таблицу за запуск. Строки
+    выгружаются командой COPY (только PostgreSQL) во временный буфер и
+    дописываются в файл только после фиксации транзакции, в которой они
+    удаляются: при откате в архиве не остаётся неудалённых строк.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.files = {}
+
+    def copy(self, model, query):
+        buffer = tempfile.SpooledTemporaryFile(max_size=DUMP_BUFFER_SIZE)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)', buffer
+            )
+        transaction.on_commit(
+            lambda: self.write(model._meta.db_table, buffer)
+        )
+
+    def write(self, table, buffer):
+        """Дописывает буфер в файл таблицы, заголовок — только первый раз."""
+        with buffer:
+            buffer.seek(0)
+            if table in self.files:
+                buffer.readline()
+            else:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self.files[table] = gzip.open(
+                    self.directory
+                    / f'{table}-{timezone.now():%Y%m%d%H%M%S}.csv.gz',
+                    'wb',
+                )
+            shutil.copyfileobj(buffer, self.files[table])
+
+    def copy_table(self, model, table):
+        self.copy(model, f'SELECT * FROM {_quote(table)}')
+
+    def __call__(self, model, pks):
+        self.copy(
+            model,
+            f'SELECT * FROM {_quote(model._meta.db_table)} '
+            f'WHERE {_quote(model._meta.pk.column)} IN ({_ids_sql(pks)})',
+        )
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+
+class TableArchive:
+    """
+    Архив в таблицах <таблица>_archive той же базы данных: для SQLite и
+    других баз, где секционирование и COPY недоступны.
+    """
+
+    def __init__(self):
+        self.created = set()
+
+    def __call__(self, model, pks):
+        table = model._meta.db_table
+        archive_table = _quote(f'{table}_archive')
+        with connection.cursor() as cursor:
+            if table not in self.created:
+                cursor.execute(
+                    f'CREATE TABLE IF NOT EXISTS {archive_table} AS '
+                    f'SELECT * FROM {_quote(table)} WHERE 0 = 1'
+                )
+                self.created.add(table)
+            cursor.execute(
+                f'INSERT INTO {archive_table} SELECT * FROM {_quote(table)} '
+                f'WHERE {_quote(model._meta.pk.column)} IN '
+                f'({_ids_sql(pks)})'
+            )
+
+    def close(self):
+        pass
+
+
+def archive_partitions(model, cutoff, archive, chunk_size=PURGE_CHUNK_SIZE):
+    """
+    Переносит в архив секции, целиком старше cutoff: в одной транзакции
+    секция выгружается, для её строк вызывается обработчик CHUNK_HOOKS,
+    а секция отсоединяется и удаляется без DELETE.
+    """
+    table = model._meta.db_table
+    pk_column = _quote(model._meta.pk.column)
+    hook = CHUNK_HOOKS.get(model)
+    archived = 0
+    for name, upper_bound in partitions(model):
+        if upper_bound > cutoff:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            archive.copy_table(model, name)
+            last_pk = 0
+            while True:
+                cursor.execute(
+                    f'SELECT {pk_column} FROM {_quote(name)} '
+                    f'WHERE {pk_column} > %s ORDER BY {pk_column} LIMIT %s',
+                    [last_pk, chunk_size],
+                )
+                pks = [row[0] for row in cursor.fetchall()]
+                if not pks:
+                    break
+                if hook:
+                    hook(pks)
+                archived += len(pks)
+                last_pk = pks[-1]
+            cursor.execute(
+                f'ALTER TABLE {_quote(table)} '
+                f'DETACH PARTITION {_quote(name)}'
+            )
+            cursor.execute(f'DROP TABLE {_quote(name)}')
+    return archived
+
+
+def archive_reviews(cutoff, archive, chunk_size=PURGE_CHUNK_SIZE):
+    """
+    Переносит в архив отзывы, опубликованные до cutoff, вместе со всеми
+    комментариями к ним. Секции комментариев старше cutoff отсоединяются
+    целиком, остальные строки удаляются пакетами с обработчиками
+    CHUNK_HOOKS: счётчики, рейтинги, статистика и журнал изменений
+    обновляются так же, как при удалении, то есть ответы API меняются.
+    Команда archive_reviews поэтому требует явного флага.
+    """
+    comments = 0
+    if is_partitioned(Comment):
+        comments += archive_partitions(Comment, cutoff, archive, chunk_size)
+    comments += delete_in_chunks(
+        Comment.objects.filter(review__pub_date__lt=cutoff),
+        chunk_size,
+        archive=archive,
+    )
+    reviews = delete_in_chunks(
+        Review.objects.filter(pub_date__lt=cutoff),
+        chunk_size,
+        archive=archive,
+    )
+    return {'comments': comments, 'reviews': reviews}
@@ -0,0 +1,111 @@
+from django.db import connection, transaction
+from django.db.models import F, Max, Min
+
+from .models import (
+    Category,
+    Change,
+    ChangeAction,
+    ChangeCompaction,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+)
+
+# Модель -> (поле родителя, поле пометки удаления или скрытия).
+TRACKED_MODELS = {
+    Category: (None, None),
+    Genre: (None, None),
+    Title: (None, 'is_deleted'),
+    GenreTitle: ('title_id', None),
+    Review: ('title_id', 'is_hidden'),
+    Comment: ('review_id', 'is_hidden'),
+}
+
+# Ключ рекомендательной блокировки PostgreSQL для назначения позиций.
+POSITION_LOCK_ID = 4201
+
+
+def record_changes(model, rows, action):
+    """
+    Добавляет записи в журнал изменений одним запросом INSERT.
+    rows — пары (id объекта, id родителя).
+    """
+    Change.objects.bulk_create(
+        Change(
+            model=model._meta.model_name,
+            object_id=object_id,
+            parent_id=parent_id,
+            action=action,
+        )
+        for object_id, parent_id in rows
+    )
+
+
+def instance_changed(instance, deleted=False):
+    """Записывает изменение объекта, сохранённого или удалённого по одному."""
+    parent_field, flag_field = TRACKED_MODELS[type(instance)]
+    if flag_field and getattr(instance, flag_field):
+        deleted = True
+    parent_id = getattr(instance, parent_field) if parent_field else None
+    record_changes(
+        type(instance),
+        [(instance.pk, parent_id)],
+        ChangeAction.DELETE if deleted else ChangeAction.SAVE,
+    )
+
+
+def rows_changed(model, pks, action):
+    """
+    Записывает изменение пакета строк, изменяемых без сигналов.
+    Вызывается до удаления строк: id родителей читаются из базы.
+    """
+    parent_field = TRACKED_MODELS[model][0]
+    if parent_field is None:
+        rows = [(pk, None) for pk in pks]
+    else:
+        rows = model.objects.filter(pk__in=pks).values_list(
+            'pk', parent_field
+        )
+    record_changes(model, rows, action)
+
+
+def compaction_horizon():
+    """Граница сжатия: курсоры меньше неё больше не поддерживаются."""
+    return (
+        ChangeCompaction.objects.order_by('-horizon')
+        .values_list('horizon', flat=True)
+        .first()
+        or 0
+    )
+
+
+def assign_positions():
+    """
+    Назначает позиции зафиксированным записям журнала без позиции.
+    Записи незафиксированных транзакций не видны, а новые позиции больше
+    всех выданных, поэтому запись долгой транзакции с меньшим id получает
+    позицию после фиксации и не оказывается позади курсора потребителя.
+    Назначения выполняются по одному (рекомендательная блокировка
+    PostgreSQL); если транзакции фиксируются в порядке id, позиция
+    совпадает с id.
+    """
+    pending = Change.objects.filter(position__isnull=True)
+    if not pending.exists():
+        return
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(%s)', [POSITION_LOCK_ID]
+                )
+        first = pending.aggregate(first=Min('pk'))['first']
+        if first is None:
+            return
+        last = Change.objects.aggregate(last=Max('position'))['last'] or 0
+        # Записи, ставшие видимыми после чтения first, ждут следующего
+        # назначения: их позиции должны быть больше выданных сейчас.
+        pending.filter(pk__gte=first).update(
+            position=F('pk') + max(0, last + 1 - first)
+        )
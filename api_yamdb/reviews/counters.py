@@ -0,0 +1,75 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Review, Title
+
+# Модель строк -> (поле родителя, модель родителя, поле счётчика).
+COUNTERS = {
+    Review: ('title_id', Title, 'review_count'),
+    Comment: ('review_id', Review, 'comment_count'),
+}
+
+
+def change_counters(model, parent_ids, sign):
+    """
+    Изменяет счётчики родителей запросами UPDATE с F(): по одному запросу
+    на каждую величину изменения. parent_ids — id родителей, по одному
+    на каждую добавленную или удалённую строку.
+    """
+    parent_field, parent_model, counter = COUNTERS[model]
+    parents_by_delta = defaultdict(list)
+    for parent_id, count in Counter(parent_ids).items():
+        parents_by_delta[sign * count].append(parent_id)
+    for delta, parents in parents_by_delta.items():
+        parent_model.objects.filter(pk__in=parents).update(
+            **{counter: F(counter) + delta}
+        )
+
+
+def rows_removed(model, pks):
+    """
+    Учитывает удаление или скрытие пакета строк, изменяемых без сигналов.
+    Вызывается до изменения: учитываются только видимые строки.
+    """
+    parent_field = COUNTERS[model][0]
+    parent_ids = model.objects.filter(
+        pk__in=pks, is_hidden=False
+    ).values_list(parent_field, flat=True)
+    change_counters(model, parent_ids, -1)
+
+
+def actual_count(model):
+    """Подзапрос с количеством видимых строк model у родителя."""
+    parent_field = COUNTERS[model][0]
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{parent_field: OuterRef('pk')}, is_hidden=False
+            )
+            .order_by()
+            .values(parent_field)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        Value(0),
+    )
+
+
+def reconcile_counters():
+    """
+    Пересчитывает счётчики, разошедшиеся с фактическим количеством
+    видимых отзывов и комментариев. Возвращает количество исправленных
+    строк по моделям.
+    """
+    fixed = {}
+    for model, (_, parent_model, counter) in COUNTERS.items():
+        actual = actual_count(model)
+        drifted = parent_model.objects.annotate(actual=actual).filter(
+            ~Q(**{counter: F('actual')})
+        )
+        fixed[parent_model._meta.label] = parent_model.objects.filter(
+            pk__in=list(drifted.values_list('pk', flat=True))
+        ).update(**{counter: actual})
+    return fixed
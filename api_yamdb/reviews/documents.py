@@ -0,0 +1,33 @@
+from django.dispatch import Signal
+
+from .models import Review, Title, TitleDocument
+
+# Данные документов произведений изменились; аргумент title_ids.
+# Документы строит получатель в приложении api (api.documents).
+titles_changed_signal = Signal()
+
+
+def titles_changed(title_ids):
+    """Обновляет документы произведений в текущей транзакции."""
+    title_ids = set(title_ids)
+    if title_ids:
+        titles_changed_signal.send(sender=TitleDocument, title_ids=title_ids)
+
+
+def reviews_changed(review_pks):
+    """Обновляет документы произведений пакета отзывов."""
+    titles_changed(
+        Review.objects.filter(pk__in=review_pks).values_list(
+            'title_id', flat=True
+        )
+    )
+
+
+def invalidate_documents(**title_lookup):
+    """
+    Удаляет документы произведений выборки одним запросом (например,
+    после переименования категории): они строятся заново при чтении.
+    """
+    TitleDocument.objects.filter(
+        title__in=Title.objects.filter(**title_lookup).values('pk')
+    ).delete()
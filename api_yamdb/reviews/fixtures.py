@@ -0,0 +1,139 @@
+import json
+import re
+from collections import Counter, defaultdict
+
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import connection, transaction
+from users.models import User
+
+from .counters import reconcile_counters
+from .documents import invalidate_documents
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .registry import category_registry, genre_registry
+from .stats import rebuild_stats
+from .suggest import suggest_index
+
+FIXTURE_READ_SIZE = 64 * 1024
+FIXTURE_BATCH_SIZE = 1000
+FIXTURE_MODELS = (User, Category, Genre, Title, GenreTitle, Review, Comment)
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class FixtureError(ValueError):
+    """Фикстура не является JSON-массивом объектов."""
+
+
+class FixtureStream:
+    """
+    Потоковый разбор фикстуры (JSON-массива объектов): при итерации
+    элементы возвращаются по одному, в памяти держится только
+    непрочитанный остаток файла и текущий объект.
+    """
+
+    def __init__(self, file, read_size=FIXTURE_READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+
+    def _read(self):
+        chunk = self.file.read(self.read_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def _peek(self):
+        """Следующий символ после пробелов (пустая строка в конце файла)."""
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self._read():
+                return self.buffer[self.position:self.position + 1]
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise FixtureError(
+                f'Ожидался один из символов {chars!r}, получено {char!r}.'
+            )
+        self.position += 1
+        return char
+
+    def _decode(self):
+        self._peek()
+        while True:
+            try:
+                item, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return item
+            except json.JSONDecodeError:
+                # Объект не поместился в буфер: дочитываем файл.
+                if not self._read():
+                    raise
+
+    def __iter__(self):
+        self._expect('[')
+        if self._peek() == ']':
+            return
+        while True:
+            item = self._decode()
+            if not isinstance(item, dict):
+                raise FixtureError('Элементы фикстуры должны быть объектами.')
+            yield item
+            if self._expect(',]') == ']':
+                return
+
+
+def load_fixture(file, batch_size=FIXTURE_BATCH_SIZE):
+    """
+    Загружает из фикстуры пользователей, категории, жанры, произведения,
+    отзывы и комментарии запросами bulk_create, группируя объекты по
+    моделям. Полные пакеты сохраняются сразу, остатки — в порядке
+    зависимостей FIXTURE_MODELS; внешние ключи проверяются в конце
+    транзакции, как в loaddata. Объекты других моделей пропускаются.
+    Сигналы не вызываются, поэтому после загрузки пересчитываются
+    статистика и счётчики, сбрасываются кэши каталога.
+    Возвращает счётчики загруженных и пропущенных объектов по моделям.
+    """
+    models = {model._meta.label_lower: model for model in FIXTURE_MODELS}
+    batches = defaultdict(list)
+    loaded = Counter({model._meta.label: 0 for model in FIXTURE_MODELS})
+    skipped = Counter()
+
+    def flush(model):
+        model.objects.bulk_create(batches[model])
+        loaded[model._meta.label] += len(batches[model])
+        batches[model] = []
+
+    with transaction.atomic():
+        with connection.constraint_checks_disabled():
+            for item in FixtureStream(file):
+                model = models.get(item.get('model', '').lower())
+                if model is None:
+                    skipped[item.get('model')] += 1
+                    continue
+                for obj in Deserializer([item]):
+                    batches[model].append(obj.object)
+                if len(batches[model]) >= batch_size:
+                    flush(model)
+            for model in FIXTURE_MODELS:
+                flush(model)
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in FIXTURE_MODELS]
+        )
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), FIXTURE_MODELS
+            ):
+                cursor.execute(sql)
+        rebuild_stats()
+        reconcile_counters()
+        invalidate_documents()
+    for cache in (suggest_index, category_registry, genre_registry):
+        cache.bump_version()
+    return loaded, skipped
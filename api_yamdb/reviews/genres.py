@@ -0,0 +1,73 @@
+from django.db import IntegrityError, connection, transaction
+
+from .changes import record_changes
+from .documents import titles_changed
+from .models import ChangeAction, GenreTitle
+from .purge import raw_delete
+from .stats import title_genres_updated
+
+GENRE_RETRIES = 3
+
+
+def set_title_genres(title, genre_ids):
+    """
+    Приводит жанры произведения к списку genre_ids по разнице с текущими
+    связями: связи читаются одним запросом, недостающие добавляются
+    одним INSERT, лишние удаляются одним DELETE. Сигналы не вызываются,
+    статистика и журнал изменений обновляются здесь же. Если связи
+    одновременно изменил другой запрос, изменения откатываются, связи
+    перечитываются и разница применяется заново (до GENRE_RETRIES раз).
+    """
+    for attempt in range(GENRE_RETRIES):
+        try:
+            with transaction.atomic():
+                return _apply_title_genres(title, genre_ids)
+        except IntegrityError:
+            if attempt == GENRE_RETRIES - 1:
+                raise
+
+
+def _apply_title_genres(title, genre_ids):
+    wanted = set(genre_ids)
+    current = dict(
+        GenreTitle.objects.filter(title_id=title.pk).values_list(
+            'genre_id', 'pk'
+        )
+    )
+    added = [
+        genre_id
+        for genre_id in dict.fromkeys(genre_ids)
+        if genre_id not in current
+    ]
+    removed = {
+        genre_id: pk
+        for genre_id, pk in current.items()
+        if genre_id not in wanted
+    }
+    if not added and not removed:
+        return
+    title_genres_updated(title.pk, added, list(removed))
+    if removed:
+        record_changes(
+            GenreTitle,
+            [(pk, title.pk) for pk in removed.values()],
+            ChangeAction.DELETE,
+        )
+        links = GenreTitle.objects.filter(pk__in=removed.values())
+        if raw_delete(links) != len(removed):
+            raise IntegrityError('Связи жанров удалены другим запросом.')
+    if added:
+        links = GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.pk, genre_id=genre_id)
+            for genre_id in added
+        )
+        if not connection.features.can_return_rows_from_bulk_insert:
+            links = GenreTitle.objects.filter(
+                title_id=title.pk, genre_id__in=added
+            )
+        record_changes(
+            GenreTitle,
+            [(link.pk, title.pk) for link in links],
+            ChangeAction.SAVE,
+        )
+    titles_changed([title.pk])
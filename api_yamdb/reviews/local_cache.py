@@ -0,0 +1,100 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from time import monotonic
+
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLocalCache(ABC):
+    """
+    Базовый класс для данных, которые каждый процесс держит в памяти.
+    Данные перестраиваются методом build(), если изменилась версия в кэше
+    Django (её увеличивает bump_version() при записи) или истёк max_age.
+    Версия проверяется не чаще раза в check_interval секунд, в остальное
+    время обращения к данным не выполняют запросов. Версия хранится в
+    общем для процессов кэше (memcached, settings.CACHES), поэтому
+    изменения из других процессов становятся видны не позже чем через
+    check_interval, а проверка версии не обращается к базе.
+    С background_build устаревшие данные перестраиваются в отдельном
+    потоке: до замены обращения получают прежние данные. Синхронно
+    данные строятся только при первом обращении и после expire().
+    """
+
+    version_key = None
+    check_interval = 5
+    max_age = 300
+    background_build = False
+
+    def __init__(self):
+        self._version = None
+        self._checked_at = None
+        self._built_at = None
+        self._building = False
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Экземпляр общий для процесса, поля сериализаторов его не копируют.
+        return self
+
+    @abstractmethod
+    def build(self):
+        """Строит данные из базы."""
+
+    def bump_version(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+        self._checked_at = None
+
+    def expire(self):
+        """Данные будут перестроены при следующем обращении."""
+        self._built_at = None
+        self._checked_at = None
+
+    def refresh(self):
+        now = monotonic()
+        if (
+            self._checked_at is not None
+            and now - self._checked_at < self.check_interval
+        ):
+            return
+        with self._lock:
+            self._checked_at = now
+            version = cache.get(self.version_key)
+            if (
+                self._built_at is None
+                or version != self._version
+                or now - self._built_at > self.max_age
+            ):
+                if self.background_build and self._built_at is not None:
+                    self.start_background_build(version)
+                    return
+                self._version = version
+                self.build()
+                self._built_at = now
+
+    def start_background_build(self, version):
+        """Запускает перестроение в потоке, если оно ещё не идёт."""
+        if self._building:
+            return
+        self._building = True
+        threading.Thread(
+            target=self.build_in_background, args=(version,), daemon=True
+        ).start()
+
+    def build_in_background(self, version):
+        try:
+            self.build()
+            with self._lock:
+                self._version = version
+                self._built_at = monotonic()
+        except Exception:
+            logger.exception('Не удалось перестроить %s', type(self).__name__)
+        finally:
+            self._building = False
+            connection.close()
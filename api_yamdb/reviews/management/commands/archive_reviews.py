@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from reviews.archive import (
+    PARTITION_MONTHS_AHEAD,
+    PARTITIONED_MODELS,
+    DumpArchive,
+    TableArchive,
+    archive_reviews,
+    create_partitions,
+    is_partitioned,
+    month_start,
+    partition_table,
+)
+from reviews.purge import PURGE_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Команда для секционирования и архивации отзывов и комментариев.
+    На PostgreSQL создаёт месячные секции комментариев на будущие месяцы
+    (с --partition сначала переводит таблицу в секционированную), а
+    отзывы и комментарии старше --older-than-months выгружает в сжатые
+    файлы CSV. На других базах старые строки переносятся в таблицы
+    <таблица>_archive. Архивированные отзывы исключаются из рейтингов,
+    счётчиков, статистики и журнала изменений, поэтому архивация
+    выполняется только с флагом --update-aggregates.
+    Запускается периодически (например, из cron).
+    """
+
+    help = 'Создаёт секции и архивирует старые отзывы и комментарии.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--partition',
+            action='store_true',
+            help='Секционировать таблицу комментариев (PostgreSQL).',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=PARTITION_MONTHS_AHEAD,
+            help='На сколько месяцев вперёд создавать секции.',
+        )
+        parser.add_argument(
+            '--older-than-months',
+            type=int,
+            help='Архивировать отзывы старше указанного числа месяцев.',
+        )
+        parser.add_argument(
+            '--update-aggregates',
+            action='store_true',
+            help='Подтвердить пересчёт рейтингов, счётчиков и статистики '
+            'без архивированных отзывов.',
+        )
+        parser.add_argument(
+            '--dump-dir',
+            default=settings.ARCHIVE_DIR,
+            help='Каталог для сжатых выгрузок (PostgreSQL).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PURGE_CHUNK_SIZE,
+            help='Количество строк, удаляемых одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        is_postgresql = connection.vendor == 'postgresql'
+        if options['partition'] and not is_postgresql:
+            raise CommandError(
+                'Секционирование доступно только для PostgreSQL.'
+            )
+        if (
+            options['older_than_months'] is not None
+            and not options['update_aggregates']
+        ):
+            raise CommandError(
+                'Архивированные отзывы исключаются из рейтингов, счётчиков, '
+                'статистики и журнала изменений. Подтвердите это флагом '
+                '--update-aggregates.'
+            )
+        for model in PARTITIONED_MODELS:
+            if options['partition'] and not is_partitioned(model):
+                partition_table(model, options['months_ahead'])
+                self.stdout.write(
+                    f'Таблица {model._meta.db_table} секционирована.'
+                )
+            if is_partitioned(model):
+                created = create_partitions(model, options['months_ahead'])
+                self.stdout.write(
+                    f'Создано секций {model._meta.db_table}: {len(created)}.'
+                )
+        if options['older_than_months'] is None:
+            return
+        cutoff = month_start(timezone.now(), -options['older_than_months'])
+        archive = (
+            DumpArchive(options['dump_dir'])
+            if is_postgresql
+            else TableArchive()
+        )
+        try:
+            counts = archive_reviews(cutoff, archive, options['chunk_size'])
+        finally:
+            archive.close()
+        self.stdout.write(
+            f'Архивировано до {cutoff:%Y-%m-%d}: отзывов {counts["reviews"]}, '
+            f'комментариев {counts["comments"]}.'
+        )
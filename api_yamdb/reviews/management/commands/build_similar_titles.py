@@ -0,0 +1,44 @@
+import resource
+from time import perf_counter
+
+from django.core.management import BaseCommand
+from reviews.similarity import (
+    SIMILAR_MAX_CELLS,
+    SIMILAR_TOP_K,
+    rebuild_similar_titles,
+)
+
+
+class Command(BaseCommand):
+    """
+    Команда для пересчёта похожих произведений по совместным отзывам.
+    Запускается периодически (например, раз в сутки из cron).
+    """
+
+    help = 'Пересчитывает таблицу похожих произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=SIMILAR_TOP_K,
+            help='Количество похожих произведений для каждого произведения.',
+        )
+        parser.add_argument(
+            '--max-cells',
+            type=int,
+            default=SIMILAR_MAX_CELLS,
+            help='Размер плотной матрицы сходства одной пачки (ячеек).',
+        )
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        reviews, saved = rebuild_similar_titles(
+            options['top_k'], options['max_cells']
+        )
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(
+            f'Отзывов: {reviews}, сохранено пар: {saved}, '
+            f'время: {perf_counter() - start:.1f} с, '
+            f'пик памяти процесса: {peak:.0f} МБ.'
+        )
@@ -0,0 +1,38 @@
+from django.core.management import BaseCommand
+from reviews.purge import (
+    CHANGE_RETENTION_DAYS,
+    PURGE_CHUNK_SIZE,
+    compact_changes,
+)
+
+
+class Command(BaseCommand):
+    """
+    Команда для сжатия журнала изменений: удаляет записи, замещённые более
+    поздними изменениями тех же объектов, и записи старше срока хранения.
+    Запускается периодически (например, из cron).
+    """
+
+    help = 'Сжимает журнал изменений каталога.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=CHANGE_RETENTION_DAYS,
+            help='Срок хранения записей в днях.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PURGE_CHUNK_SIZE,
+            help='Количество строк, удаляемых одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        compaction = compact_changes(options['days'], options['chunk_size'])
+        self.stdout.write(
+            f'Удалено замещённых записей: {compaction.superseded_rows}, '
+            f'по сроку хранения: {compaction.expired_rows}. '
+            f'Граница сжатия: {compaction.horizon}.'
+        )
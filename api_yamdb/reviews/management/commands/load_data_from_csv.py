@@ -3,7 +3,10 @@ import csv
 from django.conf import settings
 from django.core.management import BaseCommand
 from django.db import IntegrityError
+from reviews.counters import reconcile_counters
+from reviews.documents import invalidate_documents
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.stats import rebuild_stats
 from users.models import User
 
 FIELDS = {
@@ -73,3 +76,6 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         load_data()
+        rebuild_stats()
+        reconcile_counters()
+        invalidate_documents()
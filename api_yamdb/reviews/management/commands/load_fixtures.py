@@ -0,0 +1,39 @@
+import time
+
+from django.core.management import BaseCommand
+from reviews.fixtures import FIXTURE_BATCH_SIZE, load_fixture
+
+
+class Command(BaseCommand):
+    """
+    Команда для быстрого наполнения новой базы из фикстуры (например,
+    infra/fixtures.json): файл разбирается потоково, объекты сохраняются
+    пакетами без сигналов. Служебные модели (права, сессии, журнал
+    администратора) пропускаются.
+    """
+
+    help = 'Потоково загружает данные каталога из JSON-фикстуры.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу фикстуры.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=FIXTURE_BATCH_SIZE,
+            help='Количество объектов в одном запросе INSERT.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with open(options['path'], encoding='utf-8') as file:
+            loaded, skipped = load_fixture(file, options['batch_size'])
+        elapsed = time.perf_counter() - started
+        for label, count in loaded.items():
+            self.stdout.write(f'{label}: {count}')
+        if skipped:
+            self.stdout.write(f'Пропущено объектов: {sum(skipped.values())}.')
+        total = sum(loaded.values())
+        self.stdout.write(
+            f'Загружено объектов: {total} за {elapsed:.2f} с '
+            f'({total / max(elapsed, 1e-9):.0f} объектов/с).'
+        )
@@ -0,0 +1,38 @@
+from django.core.management import BaseCommand
+from reviews.purge import (
+    PURGE_CHUNK_SIZE,
+    PURGE_PAUSE,
+    run_pending_purge_jobs,
+)
+
+
+class Command(BaseCommand):
+    """
+    Команда для фонового удаления пользователей и произведений, помеченных
+    на удаление через API. Запускается периодически (например, из cron).
+    """
+
+    help = 'Удаляет помеченные на удаление объекты пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PURGE_CHUNK_SIZE,
+            help='Количество строк, удаляемых одним запросом.',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=PURGE_PAUSE,
+            help='Пауза между пакетами в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        results = run_pending_purge_jobs(
+            options['chunk_size'], options['pause']
+        )
+        self.stdout.write(
+            f'Выполнено задач: {len(results)}, '
+            f'удалено строк: {sum(results)}.'
+        )
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from reviews.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    """
+    Команда для полного пересчёта сводных таблиц статистики каталога.
+    Нужна после массовой загрузки данных в обход моделей и для
+    исправления расхождений.
+    """
+
+    help = 'Пересчитывает сводные таблицы статистики каталога.'
+
+    def handle(self, *args, **options):
+        rebuild_stats()
+        self.stdout.write('Статистика пересчитана.')
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from reviews.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    """
+    Команда для исправления расхождений счётчиков отзывов произведений и
+    комментариев отзывов с фактическим количеством видимых строк.
+    Запускается периодически или после изменения данных в обход моделей.
+    """
+
+    help = 'Пересчитывает разошедшиеся счётчики отзывов и комментариев.'
+
+    def handle(self, *args, **options):
+        for label, count in reconcile_counters().items():
+            self.stdout.write(f'{label}: исправлено {count}.')
@@ -0,0 +1,77 @@
+# Generated by Django 3.2 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurgeJob',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'target',
+                    models.CharField(
+                        choices=[
+                            ('user', 'Пользователь'),
+                            ('title', 'Произведение'),
+                        ],
+                        max_length=16,
+                        verbose_name='Тип объекта',
+                    ),
+                ),
+                (
+                    'object_id',
+                    models.PositiveIntegerField(
+                        verbose_name='Идентификатор объекта'
+                    ),
+                ),
+                (
+                    'created',
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name='Дата создания'
+                    ),
+                ),
+                (
+                    'finished',
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name='Дата завершения',
+                    ),
+                ),
+                (
+                    'deleted_rows',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Удалено строк'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Задача на удаление',
+                'verbose_name_plural': 'Задачи на удаление',
+                'ordering': ['created'],
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='is_deleted',
+            field=models.BooleanField(
+                db_index=True, default=False, verbose_name='Ожидает удаления'
+            ),
+        ),
+    ]
@@ -0,0 +1,148 @@
+# Generated by Django 3.2 on 2026-10-19 13:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_similar_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                (
+                    'titles_count',
+                    models.IntegerField(
+                        default=0, verbose_name='Количество произведений'
+                    ),
+                ),
+                (
+                    'reviews_count',
+                    models.IntegerField(
+                        default=0, verbose_name='Количество отзывов'
+                    ),
+                ),
+                (
+                    'score_sum',
+                    models.BigIntegerField(
+                        default=0, verbose_name='Сумма оценок'
+                    ),
+                ),
+                (
+                    'category',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='stats',
+                        serialize=False,
+                        to='reviews.category',
+                        verbose_name='Категория',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreStats',
+            fields=[
+                (
+                    'titles_count',
+                    models.IntegerField(
+                        default=0, verbose_name='Количество произведений'
+                    ),
+                ),
+                (
+                    'reviews_count',
+                    models.IntegerField(
+                        default=0, verbose_name='Количество отзывов'
+                    ),
+                ),
+                (
+                    'score_sum',
+                    models.BigIntegerField(
+                        default=0, verbose_name='Сумма оценок'
+                    ),
+                ),
+                (
+                    'genre',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='stats',
+                        serialize=False,
+                        to='reviews.genre',
+                        verbose_name='Жанр',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Статистика жанра',
+                'verbose_name_plural': 'Статистика жанров',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewVolume',
+            fields=[
+                (
+                    'day',
+                    models.DateField(
+                        primary_key=True, serialize=False, verbose_name='День'
+                    ),
+                ),
+                (
+                    'reviews_count',
+                    models.IntegerField(
+                        default=0, verbose_name='Количество отзывов'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Количество отзывов за день',
+                'verbose_name_plural': 'Количество отзывов по дням',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='YearStats',
+            fields=[
+                (
+                    'titles_count',
+                    models.IntegerField(
+                        default=0, verbose_name='Количество произведений'
+                    ),
+                ),
+                (
+                    'reviews_count',
+                    models.IntegerField(
+                        default=0, verbose_name='Количество отзывов'
+                    ),
+                ),
+                (
+                    'score_sum',
+                    models.BigIntegerField(
+                        default=0, verbose_name='Сумма оценок'
+                    ),
+                ),
+                (
+                    'year',
+                    models.SmallIntegerField(
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='Год выпуска',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Статистика года',
+                'verbose_name_plural': 'Статистика годов',
+                'ordering': ['year'],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 3.2 on 2026-10-19 13:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0005_catalog_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_hidden',
+            field=models.BooleanField(
+                default=False, verbose_name='Скрыт модератором'
+            ),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='is_hidden',
+            field=models.BooleanField(
+                default=False, verbose_name='Скрыт модератором'
+            ),
+        ),
+        migrations.CreateModel(
+            name='ModerationLog',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'action',
+                    models.CharField(max_length=16, verbose_name='Действие'),
+                ),
+                ('filters', models.JSONField(verbose_name='Условия отбора')),
+                (
+                    'reviews_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Отзывов'
+                    ),
+                ),
+                (
+                    'comments_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Комментариев'
+                    ),
+                ),
+                (
+                    'created',
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name='Дата'
+                    ),
+                ),
+                (
+                    'moderator',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='moderation_logs',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='Модератор',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Действие модератора',
+                'verbose_name_plural': 'Журнал модерации',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
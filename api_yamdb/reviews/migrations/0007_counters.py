@@ -0,0 +1,59 @@
+# Generated by Django 3.2 on 2026-10-19 13:28
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    for model, parent_model, parent_field, counter in (
+        (Review, Title, 'title_id', 'review_count'),
+        (Comment, Review, 'review_id', 'comment_count'),
+    ):
+        visible = (
+            model.objects.filter(
+                **{parent_field: OuterRef('pk')}, is_hidden=False
+            )
+            .order_by()
+            .values(parent_field)
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        parent_model.objects.update(
+            **{counter: Coalesce(Subquery(visible), Value(0))}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_moderation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='Количество комментариев'
+            ),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, verbose_name='Количество отзывов'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(
+                fields=['title', 'comment_count'],
+                name='review_comment_count_idx',
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
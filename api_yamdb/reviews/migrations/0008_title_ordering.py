@@ -0,0 +1,77 @@
+# Generated by Django 3.2 on 2026-10-19 13:31
+
+from django.db import migrations, models
+from django.db.models import Avg, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Title.objects.update(
+        rating=Subquery(
+            Review.objects.filter(title_id=OuterRef('pk'))
+            .order_by()
+            .values('title_id')
+            .annotate(rating=Avg('score'))
+            .values('rating')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(
+                blank=True, null=True, verbose_name='Средняя оценка'
+            ),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='Количество отзывов'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                condition=models.Q(is_deleted=False),
+                fields=['name', 'id'],
+                name='title_name_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                condition=models.Q(is_deleted=False),
+                fields=['year', 'id'],
+                name='title_year_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                condition=models.Q(is_deleted=False),
+                fields=['review_count', 'id'],
+                name='title_review_count_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                Coalesce('rating', Value(0.0)),
+                F('id'),
+                condition=models.Q(is_deleted=False),
+                name='title_rating_idx',
+            ),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 3.2 on 2026-10-19 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    'model',
+                    models.CharField(max_length=16, verbose_name='Модель'),
+                ),
+                (
+                    'object_id',
+                    models.PositiveIntegerField(
+                        verbose_name='Идентификатор объекта'
+                    ),
+                ),
+                (
+                    'parent_id',
+                    models.PositiveIntegerField(
+                        blank=True,
+                        null=True,
+                        verbose_name='Идентификатор родителя',
+                    ),
+                ),
+                (
+                    'action',
+                    models.CharField(
+                        choices=[
+                            ('save', 'Создание или изменение'),
+                            ('delete', 'Удаление или скрытие'),
+                        ],
+                        max_length=8,
+                        verbose_name='Действие',
+                    ),
+                ),
+                (
+                    'created',
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name='Дата'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeCompaction',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'horizon',
+                    models.BigIntegerField(
+                        default=0, verbose_name='Граница удалённых записей'
+                    ),
+                ),
+                (
+                    'superseded_rows',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='Удалено устаревших записей'
+                    ),
+                ),
+                (
+                    'expired_rows',
+                    models.PositiveIntegerField(
+                        default=0,
+                        verbose_name='Удалено записей по сроку хранения',
+                    ),
+                ),
+                (
+                    'created',
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name='Дата'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Сжатие журнала изменений',
+                'verbose_name_plural': 'Сжатия журнала изменений',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(
+                fields=['model', 'object_id', 'id'], name='change_object_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-19 13:41
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def delete_duplicates(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    GenreTitle.objects.filter(
+        Exists(
+            GenreTitle.objects.filter(
+                title_id=OuterRef('title_id'),
+                genre_id=OuterRef('genre_id'),
+                pk__lt=OuterRef('pk'),
+            )
+        )
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_change_feed'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(
+                fields=('title', 'genre'), name='unique_genre_title'
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-19 13:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_unique_genre_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleDocument',
+            fields=[
+                (
+                    'title',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='document',
+                        serialize=False,
+                        to='reviews.title',
+                        verbose_name='Произведение',
+                    ),
+                ),
+                ('body', models.BinaryField(verbose_name='Документ')),
+                (
+                    'updated_at',
+                    models.DateTimeField(verbose_name='Дата обновления'),
+                ),
+            ],
+            options={
+                'verbose_name': 'Документ произведения',
+                'verbose_name_plural': 'Документы произведений',
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2 on 2026-10-19 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'key',
+                    models.CharField(
+                        max_length=320, unique=True, verbose_name='Ключ'
+                    ),
+                ),
+                (
+                    'fingerprint',
+                    models.CharField(
+                        max_length=64, verbose_name='Хэш запроса'
+                    ),
+                ),
+                (
+                    'status_code',
+                    models.PositiveSmallIntegerField(
+                        blank=True, null=True, verbose_name='Код ответа'
+                    ),
+                ),
+                (
+                    'content_type',
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name='Тип ответа'
+                    ),
+                ),
+                (
+                    'body',
+                    models.BinaryField(null=True, verbose_name='Тело ответа'),
+                ),
+                (
+                    'created',
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        db_index=True,
+                        verbose_name='Дата создания',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Ключ идемпотентности',
+                'verbose_name_plural': 'Ключи идемпотентности',
+                'ordering': ['created'],
+            },
+        ),
+    ]
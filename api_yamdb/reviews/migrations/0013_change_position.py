@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-19 14:27
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_positions(apps, schema_editor):
+    """Существующие записи зафиксированы: позиция совпадает с id."""
+    Change = apps.get_model('reviews', 'Change')
+    Change.objects.update(position=F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='change',
+            name='change_object_idx',
+        ),
+        migrations.AddField(
+            model_name='change',
+            name='position',
+            field=models.BigIntegerField(
+                blank=True,
+                null=True,
+                unique=True,
+                verbose_name='Позиция в журнале',
+            ),
+        ),
+        migrations.RunPython(fill_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(
+                fields=['model', 'object_id', 'position'],
+                name='change_object_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(
+                condition=models.Q(position__isnull=True),
+                fields=['id'],
+                name='change_pending_idx',
+            ),
+        ),
+    ]
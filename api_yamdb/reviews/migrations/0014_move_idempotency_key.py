@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Модель IdempotencyKey переезжает в приложение api. Таблица
+    переименовывается, а не создаётся заново, чтобы не потерять ключи
+    запросов, выполняющихся во время обновления.
+    """
+
+    dependencies = [
+        ('reviews', '0013_change_position'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AlterModelTable(
+                    name='IdempotencyKey',
+                    table='api_idempotencykey',
+                ),
+            ],
+            state_operations=[
+                migrations.DeleteModel(name='IdempotencyKey'),
+            ],
+        ),
+    ]
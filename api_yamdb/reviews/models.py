@@ -1,10 +1,15 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Coalesce
 from users.models import User
 
 from .validators import year_create_validator
 
 
+# Произведения без оценок при сортировке по рейтингу считаются худшими.
+RATING_ORDERING = Coalesce('rating', models.Value(0.0))
+
+
 class Category(models.Model):
     """Модель, описывающая категории произведений."""
 
@@ -20,11 +25,18 @@ class Category(models.Model):
         unique=True,
         max_length=50,
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
 
     class Meta:
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
 
+    def __str__(self):
+        return self.name
+
 
 class Genre(models.Model):
     """Модель, описывающая жанры произведений."""
@@ -41,11 +53,18 @@ class Genre(models.Model):
         unique=True,
         max_length=50,
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
 
     class Meta:
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
 
+    def __str__(self):
+        return self.name
+
 
 class Title(models.Model):
     """Модель, описывающая произведения."""
@@ -80,10 +99,57 @@ class Title(models.Model):
         through='GenreTitle',
         verbose_name='Жанры произведения',
     )
+    is_deleted = models.BooleanField(
+        verbose_name='Ожидает удаления',
+        default=False,
+        db_index=True,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+        db_index=True,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+    )
+    rating = models.FloatField(
+        verbose_name='Средняя оценка',
+        null=True,
+        blank=True,
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Индексы для сортировки списка: поле сортировки и id, только
+        # произведения, не помеченные на удаление.
+        indexes = [
+            models.Index(
+                fields=['name', 'id'],
+                name='title_name_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=['year', 'id'],
+                name='title_year_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=['review_count', 'id'],
+                name='title_review_count_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(
+                RATING_ORDERING,
+                'id',
+                name='title_rating_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
 
 
 class GenreTitle(models.Model):
@@ -101,6 +167,11 @@ class GenreTitle(models.Model):
     class Meta:
         verbose_name = 'Жанры произведений'
         verbose_name_plural = 'Жанры произведений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'genre'], name='unique_genre_title'
+            ),
+        ]
 
 
 class Review(models.Model):
@@ -131,6 +202,14 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации', auto_now_add=True, db_index=True
     )
+    is_hidden = models.BooleanField(
+        verbose_name='Скрыт модератором',
+        default=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -141,6 +220,15 @@ class Review(models.Model):
                 fields=['title', 'author'], name='unique_review'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'comment_count'],
+                name='review_comment_count_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.text[:30]
 
 
 class Comment(models.Model):
@@ -164,8 +252,327 @@ class Comment(models.Model):
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации', auto_now_add=True, db_index=True
     )
+    is_hidden = models.BooleanField(
+        verbose_name='Скрыт модератором',
+        default=False,
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['pub_date']
+
+
+class SimilarTitle(models.Model):
+    """
+    Похожие произведения, рассчитанные по совместным отзывам командой
+    build_similar_titles.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='similar_titles',
+    )
+    similar = models.ForeignKey(
+        Title,
+        verbose_name='Похожее произведение',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField(
+        verbose_name='Сходство',
+    )
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'similar'], name='unique_similar_title'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['title', '-score'], name='similar_title_score_idx'
+            ),
+        ]
+
+
+class CatalogStats(models.Model):
+    """
+    Базовая модель сводной статистики группы произведений. Таблицы
+    обновляются при изменении произведений и отзывов и полностью
+    пересчитываются командой rebuild_stats.
+    """
+
+    titles_count = models.IntegerField(
+        verbose_name='Количество произведений',
+        default=0,
+    )
+    reviews_count = models.IntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+    )
+    score_sum = models.BigIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rating(self):
+        if self.reviews_count <= 0:
+            return None
+        return round(self.score_sum / self.reviews_count, 2)
+
+
+class GenreStats(CatalogStats):
+    genre = models.OneToOneField(
+        Genre,
+        verbose_name='Жанр',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика жанра'
+        verbose_name_plural = 'Статистика жанров'
+
+
+class CategoryStats(CatalogStats):
+    category = models.OneToOneField(
+        Category,
+        verbose_name='Категория',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика категории'
+        verbose_name_plural = 'Статистика категорий'
+
+
+class YearStats(CatalogStats):
+    year = models.SmallIntegerField(
+        verbose_name='Год выпуска',
+        primary_key=True,
+    )
+
+    class Meta:
+        verbose_name = 'Статистика года'
+        verbose_name_plural = 'Статистика годов'
+        ordering = ['year']
+
+
+class ReviewVolume(models.Model):
+    """Количество отзывов, опубликованных за день."""
+
+    day = models.DateField(
+        verbose_name='День',
+        primary_key=True,
+    )
+    reviews_count = models.IntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Количество отзывов за день'
+        verbose_name_plural = 'Количество отзывов по дням'
+        ordering = ['day']
+
+
+class ModerationLog(models.Model):
+    """Журнал массовых действий модераторов над отзывами и комментариями."""
+
+    moderator = models.ForeignKey(
+        User,
+        verbose_name='Модератор',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='moderation_logs',
+    )
+    action = models.CharField(
+        verbose_name='Действие',
+        max_length=16,
+    )
+    filters = models.JSONField(
+        verbose_name='Условия отбора',
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Отзывов',
+        default=0,
+    )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Комментариев',
+        default=0,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата', auto_now_add=True, db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Действие модератора'
+        verbose_name_plural = 'Журнал модерации'
+        ordering = ['-created']
+
+
+class PurgeTarget(models.TextChoices):
+    USER = 'user', 'Пользователь'
+    TITLE = 'title', 'Произведение'
+
+
+class PurgeJob(models.Model):
+    """
+    Задача на фоновое удаление пользователя или произведения вместе со
+    связанными отзывами и комментариями.
+    """
+
+    target = models.CharField(
+        verbose_name='Тип объекта',
+        max_length=16,
+        choices=PurgeTarget.choices,
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name='Идентификатор объекта',
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания', auto_now_add=True
+    )
+    finished = models.DateTimeField(
+        verbose_name='Дата завершения',
+        null=True,
+        blank=True,
+        db_index=True,
+    )
+    deleted_rows = models.PositiveIntegerField(
+        verbose_name='Удалено строк',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Задача на удаление'
+        verbose_name_plural = 'Задачи на удаление'
+        ordering = ['created']
+
+
+class ChangeAction(models.TextChoices):
+    SAVE = 'save', 'Создание или изменение'
+    DELETE = 'delete', 'Удаление или скрытие'
+
+
+class Change(models.Model):
+    """
+    Запись журнала изменений каталога для инкрементальной синхронизации.
+    Добавляется в той же транзакции, что и изменение объекта. Курсором
+    служит позиция, которую запись получает после фиксации транзакции
+    (reviews.changes.assign_positions). Для отзывов, комментариев и жанров
+    произведений хранится id родителя (произведения или отзыва).
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(
+        verbose_name='Модель',
+        max_length=16,
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name='Идентификатор объекта',
+    )
+    parent_id = models.PositiveIntegerField(
+        verbose_name='Идентификатор родителя',
+        null=True,
+        blank=True,
+    )
+    action = models.CharField(
+        verbose_name='Действие',
+        max_length=8,
+        choices=ChangeAction.choices,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата', auto_now_add=True, db_index=True
+    )
+    position = models.BigIntegerField(
+        verbose_name='Позиция в журнале',
+        null=True,
+        blank=True,
+        unique=True,
+    )
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['model', 'object_id', 'position'],
+                name='change_object_idx',
+            ),
+            models.Index(
+                fields=['id'],
+                condition=models.Q(position__isnull=True),
+                name='change_pending_idx',
+            ),
+        ]
+
+
+class ChangeCompaction(models.Model):
+    """
+    Запуск сжатия журнала изменений. horizon — наибольшая позиция записи,
+    удалённой по сроку хранения: читать журнал с более раннего курсора
+    нельзя, потребителю нужна полная синхронизация.
+    """
+
+    horizon = models.BigIntegerField(
+        verbose_name='Граница удалённых записей',
+        default=0,
+    )
+    superseded_rows = models.PositiveIntegerField(
+        verbose_name='Удалено устаревших записей',
+        default=0,
+    )
+    expired_rows = models.PositiveIntegerField(
+        verbose_name='Удалено записей по сроку хранения',
+        default=0,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата', auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'Сжатие журнала изменений'
+        verbose_name_plural = 'Сжатия журнала изменений'
+        ordering = ['-created']
+
+
+class TitleDocument(models.Model):
+    """
+    Готовый JSON-документ произведения для эндпоинта /titles/{id}/.
+    Обновляется при изменении произведения, его жанров и отзывов
+    (api.documents), при изменении категорий и жанров удаляется и
+    строится заново при чтении.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='document',
+    )
+    body = models.BinaryField(
+        verbose_name='Документ',
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата обновления',
+    )
+
+    class Meta:
+        verbose_name = 'Документ произведения'
+        verbose_name_plural = 'Документы произведений'
@@ -0,0 +1,91 @@
+from functools import partial
+
+from .changes import rows_changed
+from .counters import rows_removed
+from .documents import reviews_changed
+from .models import ChangeAction, Comment, ModerationLog, Review
+from .purge import delete_in_chunks, update_in_chunks
+from .stats import reviews_removed
+
+MODERATION_TARGETS = ('all', 'reviews', 'comments')
+MODERATION_ACTIONS = ('delete', 'hide')
+
+
+def rows_hidden(model, pks):
+    """
+    Учитывает скрытие пакета строк в счётчиках и журнале изменений, а
+    для отзывов — в рейтингах, статистике и документах произведений.
+    """
+    rows_removed(model, pks)
+    rows_changed(model, pks, ChangeAction.DELETE)
+    if model is Review:
+        reviews_removed(pks)
+        reviews_changed(pks)
+
+
+def matched_querysets(target, author=None, text_contains=None, ids=None):
+    """
+    Отзывы и комментарии, подходящие под условия отбора. Для модели,
+    которая не входит в target, возвращается None.
+    """
+    lookups = {}
+    if author is not None:
+        lookups['author'] = author
+    if text_contains:
+        lookups['text__icontains'] = text_contains
+    if ids:
+        lookups['pk__in'] = ids
+    reviews = comments = None
+    if target in ('all', 'reviews'):
+        reviews = Review.objects.filter(**lookups)
+    if target in ('all', 'comments'):
+        comments = Comment.objects.filter(**lookups)
+    return reviews, comments
+
+
+def moderate(reviews, comments, action, dry_run, moderator, filters):
+    """
+    Удаляет или скрывает отобранные отзывы и комментарии пакетными
+    запросами. При удалении отзывов удаляются и комментарии к ним.
+    В режиме dry_run только возвращает количество затрагиваемых объектов,
+    иначе выполняет действие и записывает его в журнал модерации.
+    """
+    if action == 'delete' and reviews is not None:
+        review_comments = Comment.objects.filter(
+            review__in=reviews.values('pk')
+        )
+        comments = (
+            review_comments if comments is None else comments | review_comments
+        )
+    if action == 'hide':
+        if reviews is not None:
+            reviews = reviews.filter(is_hidden=False)
+        if comments is not None:
+            comments = comments.filter(is_hidden=False)
+    if dry_run:
+        return {
+            'reviews': reviews.count() if reviews is not None else 0,
+            'comments': comments.count() if comments is not None else 0,
+        }
+
+    counts = {'reviews': 0, 'comments': 0}
+    for key, model, queryset in (
+        ('comments', Comment, comments),
+        ('reviews', Review, reviews),
+    ):
+        if queryset is None:
+            continue
+        if action == 'delete':
+            counts[key] = delete_in_chunks(queryset)
+        else:
+            counts[key] = update_in_chunks(
+                queryset, hook=partial(rows_hidden, model), is_hidden=True
+            )
+    ModerationLog.objects.create(
+        moderator=moderator,
+        action=action,
+        filters=filters,
+        reviews_count=counts['reviews'],
+        comments_count=counts['comments'],
+    )
+    return counts
@@ -0,0 +1,234 @@
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils import timezone
+from users.models import User
+
+from .changes import assign_positions, compaction_horizon, rows_changed
+from .counters import rows_removed
+from .documents import reviews_changed, titles_changed
+from .models import (
+    Change,
+    ChangeAction,
+    ChangeCompaction,
+    Comment,
+    GenreTitle,
+    PurgeJob,
+    PurgeTarget,
+    Review,
+    SimilarTitle,
+    Title,
+)
+from .signals import touch_titles
+from .stats import reviews_removed, titles_removed
+from .suggest import suggest_index
+
+PURGE_CHUNK_SIZE = 1000
+PURGE_PAUSE = 0.1
+CHANGE_RETENTION_DAYS = 30
+
+
+TOMBSTONES = {
+    Title: (PurgeTarget.TITLE, {'is_deleted': True}),
+    User: (PurgeTarget.USER, {'is_active': False}),
+}
+
+
+def raw_delete(queryset):
+    """
+    Удаляет строки выборки одним DELETE, без сбора связанных объектов и
+    без сигналов. Возвращает количество удалённых строк.
+    """
+    # QuerySet._raw_delete — закрытый API Django. Проверено на Django 3.2
+    # (requirements.txt); при обновлении Django сверить его сигнатуру.
+    return queryset._raw_delete(queryset.db)
+
+
+def schedule_purge(queryset):
+    """
+    Переводит объекты выборки (пользователей или произведения) в состояние
+    'удалено' одним запросом UPDATE и ставит задачи на их удаление.
+    """
+    target, tombstone = TOMBSTONES[queryset.model]
+    with transaction.atomic():
+        pks = list(queryset.values_list('pk', flat=True))
+        if queryset.model is Title:
+            titles_removed(pks)
+            rows_changed(Title, pks, ChangeAction.DELETE)
+        queryset.model.objects.filter(pk__in=pks).update(**tombstone)
+        if queryset.model is Title:
+            titles_changed(pks)
+        PurgeJob.objects.bulk_create(
+            PurgeJob(target=target, object_id=pk) for pk in pks
+        )
+    if queryset.model is Title:
+        suggest_index.bump_version()
+    return len(pks)
+
+
+def _reviews_chunk_deleted(pks):
+    touch_titles(reviews__pk__in=pks)
+    reviews_removed(pks)
+    rows_removed(Review, pks)
+    rows_changed(Review, pks, ChangeAction.DELETE)
+    reviews_changed(pks)
+
+
+def _comments_chunk_deleted(pks):
+    rows_removed(Comment, pks)
+    rows_changed(Comment, pks, ChangeAction.DELETE)
+
+
+def _genre_titles_chunk_deleted(pks):
+    rows_changed(GenreTitle, pks, ChangeAction.DELETE)
+
+
+CHUNK_HOOKS = {
+    Review: _reviews_chunk_deleted,
+    Comment: _comments_chunk_deleted,
+    GenreTitle: _genre_titles_chunk_deleted,
+}
+
+
+def delete_in_chunks(
+    queryset, chunk_size=PURGE_CHUNK_SIZE, pause=0, archive=None
+):
+    """
+    Удаляет строки выборки пакетами запросов DELETE ... WHERE id IN (...),
+    не загружая объекты в память и не вызывая сигналы. Каждый пакет
+    выполняется в отдельной транзакции, между пакетами выдерживается пауза.
+    Вместо сигналов для пакета вызывается обработчик из CHUNK_HOOKS,
+    а перед удалением строки пакета передаются в archive(model, pks).
+    """
+    model = queryset.model
+    hook = CHUNK_HOOKS.get(model)
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                break
+            if hook:
+                hook(pks)
+            if archive:
+                archive(model, pks)
+            deleted += raw_delete(model.objects.filter(pk__in=pks))
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def update_in_chunks(
+    queryset, chunk_size=PURGE_CHUNK_SIZE, hook=None, **values
+):
+    """
+    Обновляет строки выборки пакетами запросов UPDATE ... WHERE id IN (...),
+    перебирая их по возрастанию первичного ключа. Обработчик hook
+    вызывается для id пакета до его изменения в той же транзакции.
+    """
+    model = queryset.model
+    updated = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            if hook:
+                hook(pks)
+            updated += model.objects.filter(pk__in=pks).update(**values)
+        last_pk = pks[-1]
+    return updated
+
+
+def _title_querysets(title_id):
+    return (
+        Comment.objects.filter(review__title_id=title_id),
+        Review.objects.filter(title_id=title_id),
+        GenreTitle.objects.filter(title_id=title_id),
+        SimilarTitle.objects.filter(
+            Q(title_id=title_id) | Q(similar_id=title_id)
+        ),
+    )
+
+
+def _user_querysets(user_id):
+    return (
+        Comment.objects.filter(author_id=user_id),
+        Comment.objects.filter(review__author_id=user_id),
+        Review.objects.filter(author_id=user_id),
+    )
+
+
+PURGE_PLANS = {
+    PurgeTarget.TITLE: (_title_querysets, Title),
+    PurgeTarget.USER: (_user_querysets, User),
+}
+
+
+def run_purge_job(job, chunk_size=PURGE_CHUNK_SIZE, pause=PURGE_PAUSE):
+    """
+    Выполняет задачу на удаление: сначала пакетами удаляются зависимые
+    строки, затем сам объект (к этому моменту у него почти не остаётся
+    связей, поэтому стандартное каскадное удаление Django дешёвое).
+    """
+    get_querysets, model = PURGE_PLANS[job.target]
+    deleted = 0
+    for queryset in get_querysets(job.object_id):
+        deleted += delete_in_chunks(queryset, chunk_size, pause)
+    deleted += model.objects.filter(pk=job.object_id).delete()[0]
+    job.deleted_rows = deleted
+    job.finished = timezone.now()
+    job.save(update_fields=('deleted_rows', 'finished'))
+    return deleted
+
+
+def run_pending_purge_jobs(chunk_size=PURGE_CHUNK_SIZE, pause=PURGE_PAUSE):
+    """Выполняет все незавершённые задачи на удаление."""
+    jobs = PurgeJob.objects.filter(finished__isnull=True)
+    return [run_purge_job(job, chunk_size, pause) for job in jobs]
+
+
+def compact_changes(
+    retention_days=CHANGE_RETENTION_DAYS, chunk_size=PURGE_CHUNK_SIZE
+):
+    """
+    Сжимает журнал изменений. Сначала удаляются записи, после которых
+    есть более поздняя запись о том же объекте: потребитель с любым
+    курсором всё равно её получит. Затем удаляются записи старше срока
+    хранения, а наибольшая их позиция записывается как граница сжатия.
+    Записи без позиции (ещё не выданные потребителям) не сжимаются.
+    """
+    assign_positions()
+    positioned = Change.objects.filter(position__isnull=False)
+    superseded_rows = delete_in_chunks(
+        positioned.filter(
+            Exists(
+                Change.objects.filter(
+                    model=OuterRef('model'),
+                    object_id=OuterRef('object_id'),
+                    position__gt=OuterRef('position'),
+                )
+            )
+        ),
+        chunk_size,
+    )
+    horizon = positioned.filter(
+        created__lt=timezone.now() - timedelta(days=retention_days)
+    ).aggregate(horizon=Max('position'))['horizon']
+    expired_rows = 0
+    if horizon is not None:
+        expired_rows = delete_in_chunks(
+            Change.objects.filter(position__lte=horizon), chunk_size
+        )
+    return ChangeCompaction.objects.create(
+        horizon=max(horizon or 0, compaction_horizon()),
+        superseded_rows=superseded_rows,
+        expired_rows=expired_rows,
+    )
@@ -0,0 +1,68 @@
+from .local_cache import ProcessLocalCache
+from .models import Category, Genre
+
+
+class ReferenceRegistry(ProcessLocalCache):
+    """
+    Копия небольшого справочника (категорий или жанров) в памяти процесса
+    с доступом по id и по slug без запросов к базе. Если объекта нет в
+    копии (он только что создан в другом процессе), он ищется в базе, а
+    копия перестраивается при следующем обращении.
+    """
+
+    def __init__(self, queryset, version_key):
+        super().__init__()
+        self.queryset = queryset
+        self.version_key = version_key
+        self._data = ({}, {})
+
+    def build(self):
+        objects = list(self.queryset.all())
+        self._data = (
+            {obj.pk: obj for obj in objects},
+            {obj.slug: obj for obj in objects},
+        )
+
+    def load_missing(self, field, values):
+        """Объекты, которых нет в копии, из базы одним запросом."""
+        objects = list(self.queryset.filter(**{f'{field}__in': values}))
+        if objects:
+            self.expire()
+        return objects
+
+    def by_id(self, pk):
+        self.refresh()
+        obj = self._data[0].get(pk)
+        if obj is None and pk is not None:
+            obj = next(iter(self.load_missing('pk', [pk])), None)
+        return obj
+
+    def by_slug(self, slug):
+        self.refresh()
+        obj = self._data[1].get(slug)
+        if obj is None:
+            obj = next(iter(self.load_missing('slug', [slug])), None)
+        return obj
+
+    def ids_with_slugs(self, slugs):
+        """id объектов с точно совпадающими slug, неизвестные пропускаются."""
+        self.refresh()
+        slugs = list(dict.fromkeys(slugs))
+        found = {
+            slug: self._data[1][slug].pk
+            for slug in slugs
+            if slug in self._data[1]
+        }
+        missing = [slug for slug in slugs if slug not in found]
+        if missing:
+            for obj in self.load_missing('slug', missing):
+                found[obj.slug] = obj.pk
+        return [found[slug] for slug in slugs if slug in found]
+
+
+category_registry = ReferenceRegistry(
+    Category.objects.all(), 'category_registry_version'
+)
+genre_registry = ReferenceRegistry(
+    Genre.objects.all(), 'genre_registry_version'
+)
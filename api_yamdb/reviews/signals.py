@@ -0,0 +1,269 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import changes, counters, documents, stats
+from .models import (
+    Category,
+    ChangeAction,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+)
+from .registry import category_registry, genre_registry
+from .suggest import suggest_index
+
+
+def touch_titles(**lookup):
+    """Обновляет дату изменения произведений одним запросом UPDATE."""
+    Title.objects.filter(**lookup).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    """Изменение отзыва меняет рейтинг произведения."""
+    touch_titles(pk=instance.title_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, created=False, **kwargs):
+    if not created:
+        touch_titles(category=instance)
+        documents.invalidate_documents(category=instance)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def genre_changed(sender, instance, created=False, **kwargs):
+    if not created:
+        touch_titles(genre=instance)
+        documents.invalidate_documents(genre=instance)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def catalog_name_changed(sender, **kwargs):
+    suggest_index.bump_version()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_registry_changed(sender, **kwargs):
+    category_registry.bump_version()
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_registry_changed(sender, **kwargs):
+    genre_registry.bump_version()
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_state(sender, instance, **kwargs):
+    instance._old_score = instance._old_hidden = None
+    if instance.pk is not None:
+        old = (
+            Review.objects.filter(pk=instance.pk)
+            .values('score', 'is_hidden')
+            .first()
+        )
+        if old is not None:
+            instance._old_score = old['score']
+            instance._old_hidden = old['is_hidden']
+
+
+@receiver(post_save, sender=Review)
+def review_stats_saved(sender, instance, created, **kwargs):
+    """
+    Статистика и рейтинги учитывают только видимые отзывы: скрытие и
+    возврат отзыва учитываются как удаление и добавление.
+    """
+    if created:
+        if not instance.is_hidden:
+            stats.review_added(instance)
+    elif instance._old_hidden is None:
+        return
+    elif instance._old_hidden != instance.is_hidden:
+        if instance.is_hidden:
+            stats.review_added(instance, -1, instance._old_score)
+        else:
+            stats.review_added(instance)
+    elif not instance.is_hidden and instance._old_score != instance.score:
+        stats.review_score_changed(instance, instance._old_score)
+
+
+@receiver(post_delete, sender=Review)
+def review_stats_deleted(sender, instance, **kwargs):
+    if not instance.is_hidden:
+        stats.review_removed(instance)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_hidden(sender, instance, **kwargs):
+    instance._old_hidden = None
+    if instance.pk is not None:
+        instance._old_hidden = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list('is_hidden', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def counted_row_saved(sender, instance, created, **kwargs):
+    """
+    Счётчики отзывов произведения и комментариев отзыва учитывают
+    только видимые строки: скрытие и возврат строки меняют счётчик.
+    """
+    if created:
+        was_visible = False
+    elif instance._old_hidden is None:
+        return
+    else:
+        was_visible = not instance._old_hidden
+    if was_visible != (not instance.is_hidden):
+        parent_id = getattr(instance, counters.COUNTERS[sender][0])
+        counters.change_counters(
+            sender, [parent_id], -1 if instance.is_hidden else 1
+        )
+
+
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def counted_row_deleted(sender, instance, **kwargs):
+    if not instance.is_hidden:
+        parent_id = getattr(instance, counters.COUNTERS[sender][0])
+        counters.change_counters(sender, [parent_id], -1)
+
+
+@receiver(pre_save, sender=Title)
+def remember_title_groups(sender, instance, **kwargs):
+    instance._old_groups = None
+    if instance.pk is not None:
+        instance._old_groups = (
+            Title.objects.filter(pk=instance.pk)
+            .values('category_id', 'year', 'is_deleted')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Title)
+def title_stats_saved(sender, instance, **kwargs):
+    stats.title_saved(instance, instance._old_groups)
+
+
+@receiver(pre_delete, sender=Title)
+def title_stats_deleted(sender, instance, **kwargs):
+    """
+    Произведение исключается из статистики до каскадного удаления, а
+    пометка удаления не даёт сигналам отзывов и жанров учесть его дважды.
+    """
+    if not instance.is_deleted:
+        stats.titles_removed([instance.pk])
+        Title.objects.filter(pk=instance.pk).update(is_deleted=True)
+
+
+@receiver(post_save, sender=GenreTitle)
+def genre_title_saved(sender, instance, created, **kwargs):
+    if created:
+        stats.title_genres_changed(instance.title_id, [instance.genre_id], 1)
+
+
+@receiver(post_delete, sender=GenreTitle)
+def genre_title_deleted(sender, instance, **kwargs):
+    stats.title_genres_changed(instance.title_id, [instance.genre_id], -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_added(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Добавление жанров через title.genre.add()/set() создаёт связи
+    через bulk_create без сигнала post_save. Удаление связей вызывает
+    post_delete и обрабатывается выше.
+    """
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        for title_id in pk_set:
+            stats.title_genres_changed(title_id, [instance.pk], 1)
+        links = GenreTitle.objects.filter(
+            genre_id=instance.pk, title_id__in=pk_set
+        )
+    else:
+        stats.title_genres_changed(instance.pk, list(pk_set), 1)
+        links = GenreTitle.objects.filter(
+            title_id=instance.pk, genre_id__in=pk_set
+        )
+    changes.record_changes(
+        GenreTitle, links.values_list('pk', 'title_id'), ChangeAction.SAVE
+    )
+    documents.titles_changed(pk_set if reverse else [instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def tracked_row_saved(sender, instance, **kwargs):
+    """Запись в журнал изменений для инкрементальной синхронизации."""
+    changes.instance_changed(instance)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=GenreTitle)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def tracked_row_deleted(sender, instance, **kwargs):
+    changes.instance_changed(instance, deleted=True)
+
+
+@receiver(pre_delete, sender=Category)
+def category_titles_changed(sender, instance, **kwargs):
+    """
+    Удаление категории обнуляет её у произведений запросом UPDATE без
+    сигналов (on_delete=SET_NULL), поэтому изменение произведений
+    записывается в журнал здесь.
+    """
+    changes.rows_changed(
+        Title,
+        Title.objects.filter(category=instance, is_deleted=False).values_list(
+            'pk', flat=True
+        ),
+        ChangeAction.SAVE,
+    )
+
+
+@receiver(post_save, sender=Title)
+def title_document_saved(sender, instance, **kwargs):
+    documents.titles_changed([instance.pk])
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def title_document_related_changed(sender, instance, **kwargs):
+    """
+    Регистрируется после обработчиков статистики и счётчиков: документ
+    строится по уже обновлённым рейтингу и количеству отзывов.
+    """
+    documents.titles_changed([instance.title_id])
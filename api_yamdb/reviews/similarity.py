@@ -0,0 +1,141 @@
+from itertools import chain
+
+import numpy as np
+from django.db import transaction
+
+from .models import Review, SimilarTitle
+
+SIMILAR_TOP_K = 10
+SIMILAR_MAX_CELLS = 5000000
+SIMILAR_BATCH_SIZE = 5000
+
+
+def load_reviews():
+    """Загружает тройки (произведение, автор, оценка) в массив NumPy."""
+    reviews = (
+        Review.objects.filter(title__is_deleted=False)
+        .order_by()
+        .values_list('title_id', 'author_id', 'score')
+    )
+    flat = np.fromiter(
+        chain.from_iterable(reviews.iterator(chunk_size=10000)),
+        dtype=np.int64,
+    )
+    return flat.reshape(-1, 3)
+
+
+def _csr(row_index, columns, values, rows_count):
+    """Разреженная матрица в формате CSR: (указатели, столбцы, значения)."""
+    order = np.argsort(row_index, kind='stable')
+    pointers = np.zeros(rows_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(row_index, minlength=rows_count), out=pointers[1:])
+    return pointers, columns[order], values[order]
+
+
+def similar_titles(reviews, top_k=SIMILAR_TOP_K, max_cells=SIMILAR_MAX_CELLS):
+    """
+    Для каждого произведения находит top_k похожих по косинусному сходству
+    векторов оценок пользователей. Произведения обрабатываются пачками так,
+    чтобы и плотная матрица сходства пачки, и массивы пар отзывов пачки
+    (отзыв произведения и каждый отзыв того же автора) не превышали
+    max_cells элементов; больше может быть только пачка из одного
+    произведения. Возвращает генератор троек (произведение, похожее,
+    сходство).
+    """
+    if not len(reviews):
+        return
+    title_ids, titles = np.unique(reviews[:, 0], return_inverse=True)
+    _, users = np.unique(reviews[:, 1], return_inverse=True)
+    scores = reviews[:, 2].astype(np.float64)
+    titles_count = len(title_ids)
+    users_count = users.max() + 1
+
+    title_ptr, title_users, title_scores = _csr(
+        titles, users, scores, titles_count
+    )
+    user_ptr, user_titles, user_scores = _csr(
+        users, titles, scores, users_count
+    )
+    norms = np.sqrt(
+        np.bincount(titles, weights=scores ** 2, minlength=titles_count)
+    )
+    # Количество пар отзывов до начала каждого произведения.
+    pair_ptr = np.zeros(len(title_users) + 1, dtype=np.int64)
+    np.cumsum(np.diff(user_ptr)[title_users], out=pair_ptr[1:])
+    pair_ptr = pair_ptr[title_ptr]
+    chunk_size = max(1, max_cells // titles_count)
+    top_k = min(top_k, titles_count - 1)
+    if top_k < 1:
+        return
+
+    start = 0
+    while start < titles_count:
+        stop = (
+            np.searchsorted(
+                pair_ptr, pair_ptr[start] + max_cells, side='right'
+            )
+            - 1
+        )
+        stop = int(min(max(stop, start + 1), start + chunk_size, titles_count))
+        rows_count = stop - start
+        low, high = title_ptr[start], title_ptr[stop]
+        chunk_users = title_users[low:high]
+        rows = np.repeat(
+            np.arange(rows_count), np.diff(title_ptr[start:stop + 1])
+        )
+        # Все пары (отзыв произведения из пачки, отзыв того же автора).
+        lengths = user_ptr[chunk_users + 1] - user_ptr[chunk_users]
+        offsets = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        pairs = np.repeat(user_ptr[chunk_users], lengths) + offsets
+        dots = np.bincount(
+            np.repeat(rows, lengths) * titles_count + user_titles[pairs],
+            weights=np.repeat(title_scores[low:high], lengths)
+            * user_scores[pairs],
+            minlength=rows_count * titles_count,
+        ).reshape(rows_count, titles_count)
+        similarity = dots / np.outer(norms[start:stop], norms)
+        similarity[np.arange(rows_count), np.arange(start, stop)] = 0
+
+        neighbours = np.argpartition(-similarity, top_k - 1, axis=1)[
+            :, :top_k
+        ]
+        for row, columns in enumerate(neighbours):
+            for column in columns[np.argsort(-similarity[row, columns])]:
+                score = similarity[row, column]
+                if score > 0:
+                    yield (
+                        int(title_ids[start + row]),
+                        int(title_ids[column]),
+                        float(score),
+                    )
+        start = stop
+
+
+def rebuild_similar_titles(top_k=SIMILAR_TOP_K, max_cells=SIMILAR_MAX_CELLS):
+    """
+    Пересчитывает таблицу похожих произведений. Старые данные заменяются
+    в одной транзакции, поэтому эндпоинт не видит пустую таблицу.
+    Возвращает количество отзывов и сохранённых пар.
+    """
+    reviews = load_reviews()
+    batch = []
+    saved = 0
+    with transaction.atomic():
+        SimilarTitle.objects.all().delete()
+        for title_id, similar_id, score in similar_titles(
+            reviews, top_k, max_cells
+        ):
+            batch.append(
+                SimilarTitle(
+                    title_id=title_id, similar_id=similar_id, score=score
+                )
+            )
+            if len(batch) >= SIMILAR_BATCH_SIZE:
+                SimilarTitle.objects.bulk_create(batch)
+                saved += len(batch)
+                batch = []
+        SimilarTitle.objects.bulk_create(batch)
+        saved += len(batch)
+    return len(reviews), saved
@@ -0,0 +1,315 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    CategoryStats,
+    GenreStats,
+    GenreTitle,
+    Review,
+    ReviewVolume,
+    Title,
+    YearStats,
+)
+
+
+def _bump(model, key_field, key, **deltas):
+    """
+    Изменяет счётчики строки сводной таблицы запросом UPDATE с F().
+    Отсутствующая строка создаётся только при увеличении счётчиков:
+    уменьшать нечего, а при каскадном удалении жанра или категории
+    создание строки нарушило бы внешний ключ. Строка с обнулившимися
+    счётчиками удаляется, как если бы её не создал rebuild_stats;
+    deltas должен содержать все счётчики модели.
+    """
+    updates = {
+        field: F(field) + delta for field, delta in deltas.items() if delta
+    }
+    if not updates:
+        return
+    rows = model.objects.filter(**{key_field: key})
+    decrement = min(deltas.values()) < 0
+    if rows.update(**updates):
+        if decrement:
+            rows.filter(**{field: 0 for field in deltas}).delete()
+        return
+    if decrement:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**{key_field: key}, **deltas)
+    except IntegrityError:
+        rows.update(**updates)
+
+
+def apply_title_delta(state, titles=0, reviews=0, score=0):
+    """
+    Применяет изменения к группам произведения: категории, году и жанрам.
+    state — словарь с ключами category_id, year и genre_ids.
+    """
+    deltas = {
+        'titles_count': titles,
+        'reviews_count': reviews,
+        'score_sum': score,
+    }
+    if state['category_id'] is not None:
+        _bump(CategoryStats, 'category_id', state['category_id'], **deltas)
+    if state['year'] is not None:
+        _bump(YearStats, 'year', state['year'], **deltas)
+    for genre_id in state['genre_ids']:
+        _bump(GenreStats, 'genre_id', genre_id, **deltas)
+
+
+def title_states(title_ids):
+    """Группы живых (не помеченных на удаление) произведений."""
+    states = {
+        title['id']: dict(title, genre_ids=[])
+        for title in Title.objects.filter(
+            pk__in=title_ids, is_deleted=False
+        ).values('id', 'category_id', 'year')
+    }
+    links = GenreTitle.objects.filter(title_id__in=states).values_list(
+        'title_id', 'genre_id'
+    )
+    for title_id, genre_id in links:
+        states[title_id]['genre_ids'].append(genre_id)
+    return states
+
+
+def title_totals(title_id):
+    totals = Review.objects.filter(
+        title_id=title_id, is_hidden=False
+    ).aggregate(reviews=Count('pk'), score=Sum('score'))
+    return totals['reviews'], totals['score'] or 0
+
+
+def title_ratings(excluded_reviews=()):
+    """Подзапрос со средней оценкой произведения по видимым отзывам."""
+    return Subquery(
+        Review.objects.filter(title_id=OuterRef('pk'), is_hidden=False)
+        .exclude(pk__in=excluded_reviews)
+        .order_by()
+        .values('title_id')
+        .annotate(rating=Avg('score'))
+        .values('rating')
+    )
+
+
+def refresh_ratings(title_ids, excluded_reviews=()):
+    """
+    Пересчитывает сохранённые средние оценки произведений. Читаются
+    только отзывы этих произведений (по индексу внешнего ключа).
+    """
+    Title.objects.filter(pk__in=title_ids).update(
+        rating=title_ratings(excluded_reviews)
+    )
+
+
+def volume_changed(reviews, sign):
+    """Добавляет (sign=1) или вычитает отзывы из количества по дням."""
+    per_day = (
+        reviews.order_by()
+        .annotate(day=TruncDate('pub_date'))
+        .values('day')
+        .annotate(reviews=Count('pk'))
+    )
+    for row in per_day:
+        _bump(
+            ReviewVolume,
+            'day',
+            row['day'],
+            reviews_count=sign * row['reviews'],
+        )
+
+
+def review_added(review, sign=1, score=None):
+    """
+    Учитывает появление (sign=1) или исчезновение (sign=-1) видимого
+    отзыва. score — учитываемая оценка, если она отличается от текущей.
+    Отзывы произведений, помеченных на удаление, не учитываются.
+    """
+    if score is None:
+        score = review.score
+    refresh_ratings([review.title_id])
+    state = title_states([review.title_id]).get(review.title_id)
+    if state is None:
+        return
+    apply_title_delta(state, reviews=sign, score=sign * score)
+    _bump(
+        ReviewVolume,
+        'day',
+        timezone.localdate(review.pub_date),
+        reviews_count=sign,
+    )
+
+
+def review_removed(review):
+    review_added(review, sign=-1)
+
+
+def review_score_changed(review, old_score):
+    refresh_ratings([review.title_id])
+    state = title_states([review.title_id]).get(review.title_id)
+    if state is not None:
+        apply_title_delta(state, score=review.score - old_score)
+
+
+def reviews_removed(review_pks):
+    """
+    Учитывает удаление или скрытие пачки отзывов без сигналов.
+    Вызывается до изменения: отзывы пачки исключаются из пересчёта
+    средних оценок, скрытые отзывы в статистике уже не учтены.
+    """
+    reviews = Review.objects.filter(
+        pk__in=review_pks, is_hidden=False
+    ).order_by()
+    per_title = reviews.values('title_id').annotate(
+        reviews=Count('pk'), score=Sum('score')
+    )
+    per_title = {row['title_id']: row for row in per_title}
+    refresh_ratings(per_title, excluded_reviews=review_pks)
+    for title_id, state in title_states(per_title).items():
+        apply_title_delta(
+            state,
+            reviews=-per_title[title_id]['reviews'],
+            score=-per_title[title_id]['score'],
+        )
+    volume_changed(reviews.filter(title__is_deleted=False), -1)
+
+
+def title_moved(title_id, old_state, new_state):
+    """
+    Переносит произведение вместе с его отзывами из старых групп в новые.
+    Состояние None означает, что произведение не учитывается: при его
+    смене отзывы добавляются в количество по дням или вычитаются из него.
+    """
+    reviews, score = title_totals(title_id)
+    if old_state is not None:
+        apply_title_delta(old_state, -1, -reviews, -score)
+    if new_state is not None:
+        apply_title_delta(new_state, 1, reviews, score)
+    if reviews and (old_state is None) != (new_state is None):
+        volume_changed(
+            Review.objects.filter(title_id=title_id, is_hidden=False),
+            -1 if new_state is None else 1,
+        )
+
+
+def title_genres_changed(title_id, genre_ids, sign):
+    if sign > 0:
+        title_genres_updated(title_id, added=genre_ids, removed=())
+    else:
+        title_genres_updated(title_id, added=(), removed=genre_ids)
+
+
+def title_genres_updated(title_id, added, removed):
+    """Переносит произведение с его отзывами из removed в жанры added."""
+    state = title_states([title_id]).get(title_id)
+    if state is None:
+        return
+    reviews, score = title_totals(title_id)
+    for genre_ids, sign in ((removed, -1), (added, 1)):
+        if genre_ids:
+            apply_title_delta(
+                dict(state, category_id=None, year=None, genre_ids=genre_ids),
+                sign,
+                sign * reviews,
+                sign * score,
+            )
+
+
+def title_saved(title, old_values):
+    """
+    Учитывает создание произведения или изменение его категории, года
+    или пометки удаления. old_values — значения этих полей до сохранения
+    (None для нового произведения).
+    """
+    new_values = {
+        'category_id': title.category_id,
+        'year': title.year,
+        'is_deleted': title.is_deleted,
+    }
+    if old_values is None:
+        if not title.is_deleted:
+            apply_title_delta(dict(new_values, genre_ids=[]), titles=1)
+        return
+    if old_values == new_values:
+        return
+    genre_ids = list(
+        GenreTitle.objects.filter(title_id=title.pk).values_list(
+            'genre_id', flat=True
+        )
+    )
+    title_moved(
+        title.pk,
+        None
+        if old_values['is_deleted']
+        else dict(old_values, genre_ids=genre_ids),
+        None
+        if new_values['is_deleted']
+        else dict(new_values, genre_ids=genre_ids),
+    )
+
+
+def titles_removed(title_ids):
+    """Исключает произведения из статистики (перед пометкой удаления)."""
+    for title_id, state in title_states(title_ids).items():
+        title_moved(title_id, state, None)
+
+
+def rebuild_stats():
+    """
+    Полный пересчёт сводных таблиц запросами с GROUP BY и средних оценок
+    произведений. Учитываются видимые отзывы живых произведений.
+    """
+    live_titles = Title.objects.filter(is_deleted=False).order_by()
+    live_reviews = Review.objects.filter(
+        title__is_deleted=False, is_hidden=False
+    ).order_by()
+    live_links = GenreTitle.objects.filter(title__is_deleted=False)
+    sources = (
+        (
+            CategoryStats,
+            'category_id',
+            live_titles.filter(category__isnull=False),
+            live_reviews.filter(title__category__isnull=False),
+            'title__category_id',
+        ),
+        (YearStats, 'year', live_titles, live_reviews, 'title__year'),
+        (
+            GenreStats,
+            'genre_id',
+            live_links,
+            live_reviews.filter(title__genretitle__isnull=False),
+            'title__genretitle__genre_id',
+        ),
+    )
+    with transaction.atomic():
+        Title.objects.update(rating=title_ratings())
+        for model, key, titles, reviews, review_key in sources:
+            model.objects.all().delete()
+            title_rows = titles.values(key).annotate(titles=Count('pk'))
+            review_rows = (
+                reviews.values(review_key)
+                .annotate(reviews=Count('pk'), score=Sum('score'))
+                .values_list(review_key, 'reviews', 'score')
+            )
+            rows = defaultdict(dict)
+            for row in title_rows:
+                rows[row[key]]['titles_count'] = row['titles']
+            for group, count, score in review_rows:
+                rows[group].update(reviews_count=count, score_sum=score)
+            model.objects.bulk_create(
+                model(**{key: group}, **counters)
+                for group, counters in rows.items()
+            )
+        ReviewVolume.objects.all().delete()
+        ReviewVolume.objects.bulk_create(
+            ReviewVolume(day=row['day'], reviews_count=row['reviews'])
+            for row in live_reviews.annotate(day=TruncDate('pub_date'))
+            .values('day')
+            .annotate(reviews=Count('pk'))
+        )
@@ -0,0 +1,84 @@
+from bisect import bisect_left
+
+from .local_cache import ProcessLocalCache
+from .models import Category, Genre, Title
+
+SUGGEST_MAX_ENTRIES = 200000
+SUGGEST_MAX_KEY_LENGTH = 64
+
+SUGGEST_SOURCES = (
+    ('category', Category.objects.all(), 'slug'),
+    ('genre', Genre.objects.all(), 'slug'),
+    ('title', Title.objects.filter(is_deleted=False), 'id'),
+)
+
+
+def split_name(name):
+    """
+    Ключи индекса для названия: всё название и каждый его хвост,
+    начинающийся с нового слова, в нижнем регистре.
+    """
+    key = name.casefold()[:SUGGEST_MAX_KEY_LENGTH]
+    yield key
+    for position in range(1, len(key)):
+        if key[position - 1] == ' ' and key[position] != ' ':
+            yield key[position:]
+
+
+class PrefixIndex(ProcessLocalCache):
+    """
+    Индекс подсказок в памяти процесса: отсортированный массив ключей и
+    параллельный массив записей (тип, идентификатор, название). Поиск по
+    префиксу выполняется бинарным поиском и не обращается к базе: после
+    изменения каталога индекс перестраивается в фоновом потоке, а поиск
+    до замены массивов идёт по прежнему индексу.
+    Размер индекса ограничен SUGGEST_MAX_ENTRIES ключами.
+    """
+
+    version_key = 'suggest_index_version'
+    background_build = True
+
+    def __init__(self):
+        super().__init__()
+        self._data = ((), ())
+
+    def build(self):
+        items = []
+        for kind, queryset, ident_field in SUGGEST_SOURCES:
+            names = queryset.values_list(ident_field, 'name').iterator()
+            for ident, name in names:
+                items.extend(
+                    (key, (kind, ident, name)) for key in split_name(name)
+                )
+                if len(items) >= SUGGEST_MAX_ENTRIES:
+                    break
+        items = sorted(items[:SUGGEST_MAX_ENTRIES], key=lambda item: item[0])
+        self._data = (
+            [key for key, _ in items],
+            [entry for _, entry in items],
+        )
+
+    def suggest(self, prefix, limit):
+        """Записи, у которых название или одно из его слов начинается с
+        prefix, без повторов."""
+        prefix = prefix.casefold()[:SUGGEST_MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        self.refresh()
+        keys, entries = self._data
+        results = []
+        seen = set()
+        for position in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[position].startswith(prefix):
+                break
+            entry = entries[position]
+            if entry[:2] in seen:
+                continue
+            seen.add(entry[:2])
+            results.append(entry)
+            if len(results) >= limit:
+                break
+        return results
+
+
+suggest_index = PrefixIndex()
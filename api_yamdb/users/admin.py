@@ -1,10 +1,14 @@
+from api_yamdb.admin_tools import LargeTableAdmin
 from django.contrib import admin
+from django.utils import timezone
+from reviews.models import Comment, Review
+from reviews.purge import schedule_purge
 
-from .models import User
+from .models import User, UserRole
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'username',
@@ -16,4 +20,33 @@ class UserAdmin(admin.ModelAdmin):
     )
     list_editable = ('role',)
     search_fields = ('username',)
-    list_filter = ('role', 'is_staff')
+    list_filter = ('role', 'is_staff', 'is_active')
+    actions = ('make_moderator', 'make_user', 'purge_selected')
+    cascade_models = (Review, Comment)
+
+    @admin.action(description='Назначить роль модератора')
+    def make_moderator(self, request, queryset):
+        count = queryset.update(
+            role=UserRole.MODERATOR, updated_at=timezone.now()
+        )
+        self.message_user(request, f'Изменено пользователей: {count}.')
+
+    @admin.action(description='Назначить роль пользователя')
+    def make_user(self, request, queryset):
+        count = queryset.update(
+            role=UserRole.USER, updated_at=timezone.now()
+        )
+        self.message_user(request, f'Изменено пользователей: {count}.')
+
+    def delete_queryset(self, request, queryset):
+        return schedule_purge(queryset)
+
+    @admin.action(
+        description='Удалить выбранных пользователей в фоне',
+        permissions=['delete_cascade'],
+    )
+    def purge_selected(self, request, queryset):
+        count = self.delete_queryset(request, queryset)
+        self.message_user(
+            request, f'Поставлено в очередь на удаление: {count}.'
+        )
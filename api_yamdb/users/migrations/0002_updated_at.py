@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name='Дата изменения'
+            ),
+        ),
+    ]
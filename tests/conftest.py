@@ -1,9 +1,17 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(autouse=True)
+def nplusone_strict(settings):
+    """В тестах повторяющиеся запросы одной формы приводят к ошибке."""
+    settings.NPLUSONE = dict(settings.NPLUSONE, ENABLED=True, RAISE=True)
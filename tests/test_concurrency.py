@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+WRITERS_COUNT = 8
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentReviews:
+
+    def test_concurrent_review_creation(self):
+        if connection.vendor == 'sqlite':
+            pytest.skip('SQLite не поддерживает параллельную запись')
+        from reviews.models import Category, Review, Title
+        from users.models import User
+
+        author = User.objects.create(username='author', email='a@yamdb.ru')
+        title = Title.objects.create(
+            name='Произведение',
+            year=2000,
+            category=Category.objects.create(name='Фильмы', slug='movies'),
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        barrier = threading.Barrier(WRITERS_COUNT)
+        statuses = []
+
+        def write():
+            client = APIClient()
+            client.force_authenticate(author)
+            try:
+                barrier.wait()
+                response = client.post(
+                    url, {'text': 'Отзыв', 'score': 5}, format='json'
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=write) for _ in range(WRITERS_COUNT)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) == [201] + [400] * (WRITERS_COUNT - 1), (
+            'Проверьте, что при параллельной отправке отзывов одним автором '
+            'создаётся один отзыв, а остальные запросы получают ответ 400'
+        )
+        title.refresh_from_db()
+        assert Review.objects.filter(title=title).count() == 1
+        assert title.review_count == 1, (
+            'Проверьте, что счётчик отзывов учитывает только созданный отзыв'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestChangeFeed:
+
+    def test_long_transaction_not_skipped(self):
+        if connection.vendor == 'sqlite':
+            pytest.skip('SQLite не поддерживает параллельную запись')
+        from django.db import transaction
+        from reviews.models import Category, Change
+
+        recorded = threading.Event()
+        finish = threading.Event()
+
+        def long_transaction():
+            try:
+                with transaction.atomic():
+                    Category.objects.create(name='Долгая', slug='long')
+                    recorded.set()
+                    finish.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=long_transaction)
+        thread.start()
+        recorded.wait(10)
+        Category.objects.create(name='Быстрая', slug='fast')
+        client = APIClient()
+        first = client.get('/api/v1/changes/').json()
+        finish.set()
+        thread.join()
+        second = client.get(f'/api/v1/changes/?since={first["next"]}').json()
+
+        slugs = dict(Category.objects.values_list('pk', 'slug'))
+        ids = {
+            slugs[object_id]: pk
+            for pk, object_id in Change.objects.values_list('pk', 'object_id')
+        }
+        assert ids['long'] < ids['fast']
+        received = [
+            slugs[row['object_id']]
+            for row in first['results'] + second['results']
+        ]
+        assert received == ['fast', 'long'], (
+            'Проверьте, что запись журнала изменений из транзакции, '
+            'зафиксированной после выдачи курсора, не пропускается'
+        )
@@ -0,0 +1,97 @@
+import pytest
+from django.urls import NoReverseMatch, reverse
+from rest_framework.test import APIClient
+
+OBJECTS_COUNT = 8
+
+
+@pytest.fixture
+def catalog(db):
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import User
+
+    admin = User.objects.create(
+        username='admin', email='admin@yamdb.ru', role='admin'
+    )
+    users = [
+        User.objects.create(username=f'user{i}', email=f'user{i}@yamdb.ru')
+        for i in range(OBJECTS_COUNT)
+    ]
+    category = Category.objects.create(name='Фильмы', slug='movies')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre{i}')
+        for i in range(OBJECTS_COUNT)
+    ]
+    titles = []
+    for i in range(OBJECTS_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category
+        )
+        title.genre.set(genres[: i + 1])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text=f'Отзыв {i}', score=i + 1
+        )
+        for i, user in enumerate(users)
+    ]
+    for user in users:
+        Comment.objects.create(
+            review=reviews[0], author=user, text='Комментарий'
+        )
+    return {
+        'admin': admin,
+        'title_id': titles[0].pk,
+        'review_id': reviews[0].pk,
+        'comment_id': reviews[0].comments.first().pk,
+        'pk': titles[0].pk,
+        'slug': 'movies',
+        'username': users[0].username,
+    }
+
+
+class TestNPlusOne:
+
+    def test_api_v1_views(self, catalog):
+        from api.v1.urls import router
+
+        client = APIClient()
+        client.force_authenticate(catalog['admin'])
+        lookups = {
+            'reviews': {'pk': catalog['review_id']},
+            'comments': {'pk': catalog['comment_id']},
+        }
+        urls = [reverse('api:api_v1:search_suggest') + '?q=Про']
+        for prefix, viewset, basename in router.registry:
+            url_kwargs = {
+                name: catalog[name]
+                for name in ('title_id', 'review_id')
+                if f'<{name}>' in prefix
+            }
+            urls.append(
+                reverse(f'api:api_v1:{basename}-list', kwargs=url_kwargs)
+            )
+            lookup_field = getattr(viewset, 'lookup_field', 'pk')
+            try:
+                urls.append(
+                    reverse(
+                        f'api:api_v1:{basename}-detail',
+                        kwargs=dict(
+                            url_kwargs,
+                            **lookups.get(
+                                basename,
+                                {lookup_field: catalog.get(lookup_field)},
+                            ),
+                        ),
+                    )
+                )
+            except NoReverseMatch:
+                pass
+        urls.append(
+            reverse('api:api_v1:titles-similar', args=[catalog['title_id']])
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code in (200, 404, 405), (
+                f'Проверьте, что запрос GET {url} выполняется без ошибок'
+            )
@@ -0,0 +1,32 @@
+import gzip
+import json
+import re
+
+from django.core.management import call_command
+
+
+class TestStaticFiles:
+
+    def test_static_manifest(self, settings, tmp_path):
+        settings.STATIC_ROOT = str(tmp_path)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        manifest_path = tmp_path / 'staticfiles.json'
+        assert manifest_path.is_file(), (
+            'Проверьте, что collectstatic создаёт манифест staticfiles.json'
+        )
+        paths = json.loads(manifest_path.read_text())['paths']
+        assert re.fullmatch(r'redoc\.[0-9a-f]{12}\.yaml', paths.get('redoc.yaml', '')), (
+            'Проверьте, что в манифест добавлен redoc.yaml с хэшем в имени файла'
+        )
+        for name in ('redoc.yaml', 'admin/css/base.css'):
+            for stored_name in (name, paths[name]):
+                compressed = tmp_path / f'{stored_name}.gz'
+                assert compressed.is_file(), (
+                    f'Проверьте, что для {stored_name} создаётся сжатая копия .gz'
+                )
+                assert gzip.decompress(compressed.read_bytes()) == (
+                    tmp_path / stored_name
+                ).read_bytes(), (
+                    f'Проверьте, что {compressed.name} совпадает с исходным файлом'
+                )
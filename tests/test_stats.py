@@ -0,0 +1,103 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def rated_title(db):
+    from reviews.models import Category, Genre, Review, Title
+    from users.models import User
+
+    moderator = User.objects.create(
+        username='moderator', email='moderator@yamdb.ru', role='moderator'
+    )
+    spammer = User.objects.create(username='spammer', email='s@yamdb.ru')
+    reader = User.objects.create(username='reader', email='r@yamdb.ru')
+    title = Title.objects.create(
+        name='Произведение',
+        year=2000,
+        category=Category.objects.create(name='Фильмы', slug='movies'),
+    )
+    title.genre.set([Genre.objects.create(name='Драма', slug='drama')])
+    Review.objects.create(title=title, author=spammer, text='Спам', score=1)
+    Review.objects.create(title=title, author=reader, text='Отзыв', score=10)
+    return {'moderator': moderator, 'spammer': spammer, 'title': title}
+
+
+class TestReviewStats:
+
+    def stats(self, client):
+        return {
+            name: [
+                (row['slug'], row['reviews_count'], row['rating'])
+                for row in client.get(f'/api/v1/stats/{name}/').json()
+            ]
+            for name in ('genres', 'categories')
+        }
+
+    def test_hidden_review_excluded(self, rated_title):
+        client = APIClient()
+        client.force_authenticate(rated_title['moderator'])
+        response = client.post(
+            '/api/v1/moderation/',
+            {'action': 'hide', 'author': 'spammer'},
+            format='json',
+        )
+        assert response.status_code == 200
+        title = rated_title['title']
+        title.refresh_from_db()
+        assert (title.review_count, title.rating) == (1, 10), (
+            'Проверьте, что скрытый отзыв не учитывается в счётчике '
+            'отзывов и рейтинге произведения'
+        )
+        assert self.stats(client) == {
+            'genres': [('drama', 1, 10)],
+            'categories': [('movies', 1, 10)],
+        }, 'Проверьте, что скрытый отзыв не учитывается в статистике'
+        detail = client.get(f'/api/v1/titles/{title.pk}/').json()
+        assert (detail['review_count'], detail['rating']) == (1, 10)
+
+    def stats_rows(self):
+        from reviews.models import (
+            CategoryStats,
+            GenreStats,
+            ReviewVolume,
+            Title,
+            YearStats,
+        )
+
+        rows = {
+            model.__name__: sorted(
+                tuple(row.values()) for row in model.objects.values()
+            )
+            for model in (CategoryStats, GenreStats, YearStats, ReviewVolume)
+        }
+        rows['ratings'] = sorted(Title.objects.values_list('pk', 'rating'))
+        return rows
+
+    def test_rebuild_matches_incremental(self, rated_title):
+        from reviews.models import Category, Genre, Review, Title
+        from reviews.purge import run_pending_purge_jobs, schedule_purge
+        from reviews.stats import rebuild_stats
+
+        title = rated_title['title']
+        title.refresh_from_db()
+        title.genre.add(Genre.objects.create(name='Рок', slug='rock'))
+        title.genre.remove(Genre.objects.get(slug='drama'))
+        title.category = Category.objects.create(name='Книги', slug='books')
+        title.year = 2001
+        title.save()
+        spam = Review.objects.get(author=rated_title['spammer'])
+        spam.is_hidden = True
+        spam.save()
+        other = Title.objects.create(name='Другое', year=1999)
+        Review.objects.create(
+            title=other, author=rated_title['moderator'], text='-', score=5
+        )
+        schedule_purge(Title.objects.filter(pk=other.pk))
+        run_pending_purge_jobs(pause=0)
+        incremental = self.stats_rows()
+        rebuild_stats()
+        assert self.stats_rows() == incremental, (
+            'Проверьте, что rebuild_stats получает те же строки сводных '
+            'таблиц, что и пошаговое обновление статистики'
+        )